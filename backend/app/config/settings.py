@@ -13,6 +13,10 @@ class Settings(BaseSettings):
     supabase_url: str
     supabase_anon_key: str
     supabase_service_key: str
+    supabase_jwt_secret: Optional[str] = None  # Enables local verification of access tokens
+    supabase_auth_webhook_secret: Optional[str] = None  # Signing secret for auth event webhooks
+    supabase_db_url: Optional[str] = None  # Direct Postgres DSN for hot-path reads (PostgREST otherwise)
+    pg_pool_max_size: int = 5  # Keep well below Supabase's connection limit
     
     # Google AI Configuration
     google_api_key: str
@@ -1,11 +1,14 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 from dotenv import load_dotenv
 
-from app.routes import stream_routes, auth_routes, project_routes, brand_kit_routes, stripe_routes, user_routes
+from app.routes import stream_routes, auth_routes, project_routes, brand_kit_routes, stripe_routes, user_routes, webhook_routes
 from app.models.schemas import HealthResponse
-from app.services.supabase_service import supabase_service
+from app.services.supabase_service import get_supabase_service
+from app.services.http_client import get_http_client, close_http_client
+from app.services.pg_pool import close_pg_pool
 
 # Load environment variables
 load_dotenv()
@@ -14,12 +17,21 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared outbound HTTP pool on startup and close pools once on shutdown."""
+    get_http_client()
+    yield
+    await close_http_client()
+    await close_pg_pool()
+
 app = FastAPI(
     title="LogoKraft API",
     description="AI-powered logo generation backend with authentication and project management",
     version="0.2.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -36,6 +48,7 @@ app.include_router(user_routes.router)  # User profile and OAuth management
 app.include_router(project_routes.router)
 app.include_router(brand_kit_routes.router)  # $29 monetization endpoints
 app.include_router(stripe_routes.router)  # Stripe payment processing
+app.include_router(webhook_routes.router)  # Supabase auth events (session cache invalidation)
 app.include_router(stream_routes.router)  # Keep legacy test endpoint
 
 @app.get("/", 
@@ -61,7 +74,7 @@ async def health_check():
     """
     try:
         # Check database connection
-        db_healthy = await supabase_service.health_check()
+        db_healthy = await get_supabase_service().health_check()
         
         return HealthResponse(
             status="healthy" if db_healthy else "degraded",
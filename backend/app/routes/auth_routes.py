@@ -13,7 +13,7 @@ from app.models.schemas import (
     OAuthCallbackRequest,
     OAuthURLResponse
 )
-from app.services.supabase_service import supabase_service
+from app.services.supabase_service import get_supabase_service
 from app.services.oauth_service import oauth_service
 
 logger = logging.getLogger(__name__)
@@ -52,7 +52,7 @@ async def signup(user_data: UserSignupRequest):
         logger.info(f"Signup attempt for email: {user_data.email}")
         
         # Create user via Supabase service
-        auth_result = await supabase_service.signup(
+        auth_result = await get_supabase_service().signup(
             email=user_data.email,
             password=user_data.password
         )
@@ -120,7 +120,7 @@ async def login(user_data: UserLoginRequest):
         logger.info(f"Login attempt for email: {user_data.email}")
         
         # Authenticate via Supabase service
-        auth_result = await supabase_service.login(
+        auth_result = await get_supabase_service().login(
             email=user_data.email,
             password=user_data.password
         )
@@ -170,7 +170,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     """
     try:
         token = credentials.credentials
-        user_data = await supabase_service.get_user(token)
+        user_data = await get_supabase_service().get_user(token)
         
         if user_data is None:
             raise HTTPException(
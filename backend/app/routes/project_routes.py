@@ -17,7 +17,7 @@ from app.models.schemas import (
     SimpleRefinementRequest,
     SimpleRefinementResponse
 )
-from app.services.supabase_service import supabase_service
+from app.services.supabase_service import get_supabase_service
 from app.services.orchestrator_service import OrchestratorService
 from app.services.simple_refinement_service import simple_refinement_service
 from app.routes.auth_routes import get_current_user
@@ -98,7 +98,7 @@ async def create_project(
             )
         
         # Handle inspiration image upload if provided
-        inspiration_image_url = None
+        inspiration_image_path = None
         if inspiration_image:
             # Validate file type
             if not inspiration_image.content_type or not inspiration_image.content_type.startswith('image/'):
@@ -107,17 +107,15 @@ async def create_project(
                     detail="Uploaded file must be an image"
                 )
             
-            # Read file content
-            file_content = await inspiration_image.read()
-            
-            # Upload to storage
+            # Upload to storage, streaming from the spooled upload file
             try:
-                inspiration_image_url = await supabase_service.upload_inspiration_image(
-                    file_content=file_content,
+                inspiration_image_path = await get_supabase_service().upload_inspiration_image(
+                    file=inspiration_image.file,
                     filename=inspiration_image.filename or "inspiration.jpg",
-                    user_id=current_user.id
+                    user_id=current_user.id,
+                    content_type=inspiration_image.content_type
                 )
-                logger.info(f"Inspiration image uploaded: {inspiration_image_url}")
+                logger.info(f"Inspiration image uploaded: {inspiration_image_path}")
             except Exception as e:
                 logger.error(f"Image upload failed: {e}")
                 raise HTTPException(
@@ -129,10 +127,11 @@ async def create_project(
         project_data = {
             "project_name": project_name.strip(),
             "brief_data": brief_data,  # Use the simplified brief_data
-            "inspiration_image_url": inspiration_image_url
+            # The storage path is stored; reads sign it on demand
+            "inspiration_image_url": inspiration_image_path
         }
         
-        created_project = await supabase_service.create_project(
+        created_project = await get_supabase_service().create_project(
             user_id=current_user.id,
             project_data=project_data
         )
@@ -187,7 +186,7 @@ async def get_project(
         logger.info(f"Getting project {project_id} for user {current_user.id}")
         
         # Get project from database (includes user authorization check)
-        project = await supabase_service.get_project(project_id, current_user.id)
+        project = await get_supabase_service().get_project_full(project_id, current_user.id)
         
         if project is None:
             raise HTTPException(
@@ -233,7 +232,7 @@ async def get_project_assets(
         logger.info(f"Getting assets for project {project_id} for user {current_user.id}")
         
         # Verify user owns this project
-        project = await supabase_service.get_project(project_id, current_user.id)
+        project = await get_supabase_service().get_project(project_id, current_user.id)
         if project is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -241,7 +240,7 @@ async def get_project_assets(
             )
         
         # Get assets
-        assets = await supabase_service.get_project_assets(project_id)
+        assets = await get_supabase_service().get_project_assets(project_id)
         
         return [AssetResponse(**asset) for asset in assets]
         
@@ -285,7 +284,7 @@ async def stream_project_updates(
         logger.info(f"Starting SSE stream for project {project_id} for user {current_user.id}")
         
         # Verify user owns this project
-        project = await supabase_service.get_project(project_id, current_user.id)
+        project = await get_supabase_service().get_project(project_id, current_user.id)
         if project is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -313,7 +312,7 @@ async def stream_project_updates(
                 while True:
                     try:
                         # Get current assets
-                        current_assets = await supabase_service.get_project_assets(project_id)
+                        current_assets = await get_supabase_service().get_project_assets(project_id)
                         
                         # Check for changes
                         for asset in current_assets:
@@ -444,14 +443,14 @@ async def simple_refine_logo(
         logger.info(f"Starting simple refinement for asset {asset_id} by user {current_user.id}")
         
         # Verify user owns the asset by checking project ownership
-        asset = await supabase_service.get_asset_by_id(asset_id)
+        asset = await get_supabase_service().get_asset_by_id(asset_id)
         if not asset:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Asset not found"
             )
             
-        project = await supabase_service.get_project(asset['project_id'], current_user.id)
+        project = await get_supabase_service().get_project(asset['project_id'], current_user.id)
         if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -514,14 +513,14 @@ async def stream_refinement_progress(
         logger.info(f"Starting refinement SSE stream for asset {asset_id} for user {current_user.id}")
         
         # Verify user owns the asset
-        asset = await supabase_service.get_asset_by_id(asset_id)
+        asset = await get_supabase_service().get_asset_by_id(asset_id)
         if not asset:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Asset not found"
             )
             
-        project = await supabase_service.get_project(asset['project_id'], current_user.id)
+        project = await get_supabase_service().get_project(asset['project_id'], current_user.id)
         if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -12,7 +12,7 @@ import json
 from app.models.schemas import UserResponse
 from app.services.stripe_service import stripe_service
 from app.services.brand_kit_service import brand_kit_service
-from app.services.supabase_service import supabase_service
+from app.services.supabase_service import get_supabase_service
 from app.routes.auth_routes import get_current_user
 
 logger = logging.getLogger(__name__)
@@ -115,7 +115,7 @@ async def handle_payment_success(payment_intent: dict):
         logger.info(f"Payment successful for user {user_id}, asset {asset_id}")
         
         # Update brand kit order status
-        await supabase_service.client.table('brand_kit_orders').update({
+        await get_supabase_service().client.table('brand_kit_orders').update({
             'payment_status': 'completed',
             'payment_reference': payment_intent['id'],
             'payment_confirmed_at': 'now()',
@@ -123,7 +123,7 @@ async def handle_payment_success(payment_intent: dict):
         }).eq('user_id', user_id).eq('selected_asset_id', asset_id).eq('order_status', 'pending').execute()
         
         # Find the order and start generation
-        result = await supabase_service.client.table('brand_kit_orders').select('*').eq(
+        result = await get_supabase_service().client.table('brand_kit_orders').select('*').eq(
             'payment_reference', payment_intent['id']
         ).single().execute()
         
@@ -157,7 +157,7 @@ async def handle_payment_failure(payment_intent: dict):
         
         # Update order status if exists
         if user_id and asset_id:
-            await supabase_service.client.table('brand_kit_orders').update({
+            await get_supabase_service().client.table('brand_kit_orders').update({
                 'payment_status': 'failed',
                 'payment_reference': payment_intent['id'],
                 'error_message': payment_intent.get('last_payment_error', {}).get('message', 'Payment failed')
@@ -204,7 +204,7 @@ async def handle_refund(charge: dict):
         
         # Update order status
         if payment_intent_id:
-            await supabase_service.client.table('brand_kit_orders').update({
+            await get_supabase_service().client.table('brand_kit_orders').update({
                 'order_status': 'refunded',
                 'refunded_amount': refunded_amount / 100,  # Convert to dollars
                 'refunded_at': 'now()'
@@ -235,7 +235,7 @@ async def create_payment_intent(
     """
     try:
         # Verify user owns the asset
-        asset_result = await supabase_service.client.table('generated_assets').select(
+        asset_result = await get_supabase_service().client.table('generated_assets').select(
             'id, project_id'
         ).eq('id', selected_asset_id).single().execute()
         
@@ -245,7 +245,7 @@ async def create_payment_intent(
                 detail="Asset not found"
             )
         
-        project_result = await supabase_service.client.table('brand_projects').select(
+        project_result = await get_supabase_service().client.table('brand_projects').select(
             'user_id'
         ).eq('id', asset_result.data['project_id']).single().execute()
         
@@ -263,7 +263,7 @@ async def create_payment_intent(
         )
         
         # Create pending order in database
-        order_result = await supabase_service.client.table('brand_kit_orders').insert({
+        order_result = await get_supabase_service().client.table('brand_kit_orders').insert({
             'user_id': current_user.id,
             'project_id': asset_result.data['project_id'],
             'selected_asset_id': selected_asset_id,
@@ -314,7 +314,7 @@ async def create_checkout_session(
     """
     try:
         # Verify asset ownership (same as above)
-        asset_result = await supabase_service.client.table('generated_assets').select(
+        asset_result = await get_supabase_service().client.table('generated_assets').select(
             'id, project_id'
         ).eq('id', selected_asset_id).single().execute()
         
@@ -324,7 +324,7 @@ async def create_checkout_session(
                 detail="Asset not found"
             )
         
-        project_result = await supabase_service.client.table('brand_projects').select(
+        project_result = await get_supabase_service().client.table('brand_projects').select(
             'user_id'
         ).eq('id', asset_result.data['project_id']).single().execute()
         
@@ -344,7 +344,7 @@ async def create_checkout_session(
         )
         
         # Create pending order
-        order_result = await supabase_service.client.table('brand_kit_orders').insert({
+        order_result = await get_supabase_service().client.table('brand_kit_orders').insert({
             'user_id': current_user.id,
             'project_id': asset_result.data['project_id'],
             'selected_asset_id': selected_asset_id,
@@ -398,7 +398,7 @@ async def process_refund(
         # For now, only allow users to refund their own orders
         
         # Get order details
-        order_result = await supabase_service.client.table('brand_kit_orders').select(
+        order_result = await get_supabase_service().client.table('brand_kit_orders').select(
             '*'
         ).eq('id', order_id).eq('user_id', current_user.id).single().execute()
         
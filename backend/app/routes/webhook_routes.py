@@ -0,0 +1,86 @@
+"""
+Supabase webhook routes for LogoKraft
+Receives auth events and evicts cached token validations
+"""
+
+from fastapi import APIRouter, HTTPException, Request, status
+import logging
+from typing import Any, Dict, Optional
+
+from app.services.supabase_service import get_supabase_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/v1/webhooks",
+    tags=["Webhooks"],
+    responses={
+        400: {"description": "Bad Request"},
+        500: {"description": "Internal Server Error"}
+    }
+)
+
+
+def _event_user_id(event: Dict[str, Any]) -> Optional[str]:
+    """
+    Extract the affected user ID from an auth event.
+
+    Accepts database webhook payloads on auth.users / auth.sessions /
+    auth.identities (record or old_record) as well as flat events that
+    carry a top-level user_id.
+
+    Args:
+        event: Parsed webhook payload
+
+    Returns:
+        User ID, or None if the event does not identify a user
+    """
+    row = event.get("old_record") or event.get("record") or {}
+    if event.get("table") == "users":
+        return row.get("id")
+    return row.get("user_id") or event.get("user_id")
+
+
+@router.post("/supabase-auth",
+    status_code=status.HTTP_200_OK,
+    summary="Supabase auth webhook endpoint",
+    description="Receives auth events (sign-out, token refresh, user deletion) and invalidates cached sessions"
+)
+async def supabase_auth_webhook(request: Request):
+    """
+    Handle Supabase auth events.
+
+    Any event for a user drops that user's cached token validations, so the
+    next request re-validates against Supabase Auth.
+
+    Args:
+        request: Raw request with body and Standard Webhooks headers
+
+    Returns:
+        Acknowledgment with the number of evicted cache entries
+    """
+    payload = await request.body()
+    try:
+        event = get_supabase_service().verify_auth_webhook(payload, request.headers)
+    except ValueError as e:
+        logger.error(f"Auth webhook verification failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid webhook signature"
+        )
+
+    if not isinstance(event, dict):
+        logger.error(f"Auth webhook payload is not a JSON object: {type(event).__name__}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Webhook payload must be a JSON object"
+        )
+
+    user_id = _event_user_id(event)
+    if not user_id:
+        logger.info(f"Auth webhook without a user: {event.get('type')}")
+        return {"status": "ignored"}
+
+    evicted = get_supabase_service().invalidate_user(user_id)
+    logger.info(f"🔐 Auth event {event.get('type')} for user {user_id}: evicted {evicted} cached sessions")
+    return {"status": "success", "evicted": evicted}
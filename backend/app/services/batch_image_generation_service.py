@@ -15,7 +15,9 @@ import fal_client
 import time
 
 from app.config.settings import settings
-from app.services.supabase_service import SupabaseService
+from app.services.http_client import get_http_client
+from app.services.image_generation_service import prefetch_variation_prompts
+from app.services.supabase_service import SupabaseService, get_supabase_service
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +27,25 @@ class BatchImageGenerationService:
     Much faster than sequential generation.
     """
     
-    def __init__(self):
-        """Initialize with fal.ai client and Supabase service."""
+    @property
+    def supabase_service(self) -> SupabaseService:
+        """Shared Supabase service; its client is created on first use."""
+        return get_supabase_service()
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Injected client, else the process-wide one looked up per use (it is re-created after shutdown)."""
+        return self._http_client or get_http_client()
+    
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize with fal.ai client and Supabase service.
+        
+        Args:
+            http_client: Shared async HTTP client (defaults to the process-wide client)
+        """
         self.fal_key = settings.fal_key
-        self.supabase_service = SupabaseService()
+        self._http_client = http_client
         
         # Configure fal_client
         import os
@@ -51,6 +68,10 @@ class BatchImageGenerationService:
             
         Returns:
             Dictionary with generation results and statistics
+            
+        Raises:
+            Exception: If the batch crashes before every asset is settled; the
+                caller's done-callback marks the unfinished assets as failed
         """
         try:
             logger.info(f"Starting batch generation of {len(prompts)} logos")
@@ -101,12 +122,15 @@ class BatchImageGenerationService:
             # Step 3: Process results and update database
             success_count = 0
             failed_count = 0
+            completed: Dict[str, str] = {}
             
             for result_data in results:
                 if result_data["success"]:
                     success_count += 1
                     # Download and upload image
-                    await self._process_successful_result(result_data)
+                    storage_url = await self._process_successful_result(result_data)
+                    if storage_url:
+                        completed[result_data["asset_id"]] = storage_url
                 else:
                     failed_count += 1
                     # Update with error
@@ -116,6 +140,10 @@ class BatchImageGenerationService:
                         error_message=result_data["error"]
                     )
             
+            # One prefetch per project, shared by all of its finished logos
+            if completed:
+                prefetch_variation_prompts(list(completed), next(iter(completed.values())))
+            
             # Return statistics
             return {
                 "total_requested": len(prompts),
@@ -130,12 +158,7 @@ class BatchImageGenerationService:
             
         except Exception as e:
             logger.error(f"Batch generation failed: {str(e)}")
-            return {
-                "total_requested": len(prompts),
-                "successful": 0,
-                "failed": len(prompts),
-                "error": str(e)
-            }
+            raise
     
     async def _poll_all_results(self, submitted_requests: List[Dict]) -> List[Dict]:
         """Poll all submitted requests for results."""
@@ -204,17 +227,16 @@ class BatchImageGenerationService:
                 "error": str(e)
             }
     
-    async def _process_successful_result(self, result_data: Dict):
-        """Download image and upload to storage."""
+    async def _process_successful_result(self, result_data: Dict) -> Optional[str]:
+        """Download image and upload to storage. Returns the stored URL on success."""
         try:
             asset_id = result_data["asset_id"]
             image_url = result_data["image_url"]
             
             # Download image
-            async with httpx.AsyncClient() as client:
-                response = await client.get(image_url)
-                response.raise_for_status()
-                image_data = response.content
+            response = await self.http_client.get(image_url)
+            response.raise_for_status()
+            image_data = response.content
             
             # Upload to storage
             filename = f"logo_{asset_id}_{uuid.uuid4().hex[:8]}.png"
@@ -222,8 +244,10 @@ class BatchImageGenerationService:
             
             if storage_url:
                 await self._update_asset_status(asset_id, "completed", asset_url=storage_url)
-            else:
-                await self._update_asset_status(asset_id, "failed", error_message="Storage upload failed")
+                return storage_url
+            
+            await self._update_asset_status(asset_id, "failed", error_message="Storage upload failed")
+            return None
                 
         except Exception as e:
             logger.error(f"Failed to process result for {result_data['asset_id']}: {str(e)}")
@@ -232,6 +256,7 @@ class BatchImageGenerationService:
                 "failed", 
                 error_message=f"Processing failed: {str(e)}"
             )
+            return None
     
     async def _upload_to_storage(self, image_data: bytes, filename: str) -> Optional[str]:
         """Upload image to Supabase storage."""
@@ -11,7 +11,7 @@ from io import BytesIO
 import json
 from datetime import datetime, timedelta
 
-from app.services.supabase_service import supabase_service
+from app.services.supabase_service import get_supabase_service
 from app.services.image_generation_service import ImageGenerationService
 
 logger = logging.getLogger(__name__)
@@ -84,7 +84,7 @@ class BrandKitService:
             logger.info(f"Creating brand kit order for user {user_id} with asset {selected_asset_id}")
             
             # Create order using secure RPC function
-            result = supabase_service.client.rpc(
+            result = get_supabase_service().client.rpc(
                 'create_brand_kit_order',
                 {
                     'p_user_id': user_id,
@@ -264,7 +264,7 @@ class BrandKitService:
     async def _get_asset_details(self, asset_id: str) -> Optional[Dict[str, Any]]:
         """Get details of the selected asset including project info."""
         try:
-            result = supabase_service.client.table('generated_assets')\
+            result = get_supabase_service().client.table('generated_assets')\
                 .select('*, brand_projects!inner(project_name, user_id)')\
                 .eq('id', asset_id)\
                 .single()\
@@ -301,7 +301,7 @@ class BrandKitService:
             if error_message:
                 update_data["error_message"] = error_message
             
-            supabase_service.client.table('brand_kit_orders')\
+            get_supabase_service().client.table('brand_kit_orders')\
                 .update(update_data)\
                 .eq('id', order_id)\
                 .execute()
@@ -321,7 +321,7 @@ class BrandKitService:
         """Update progress for a specific component."""
         try:
             # Use the secure RPC function to update progress
-            result = supabase_service.client.rpc(
+            result = get_supabase_service().client.rpc(
                 'update_brand_kit_progress',
                 {
                     'p_order_id': order_id,
@@ -352,7 +352,7 @@ class BrandKitService:
             Dict with order status and component progress
         """
         try:
-            result = supabase_service.client.table('brand_kit_orders')\
+            result = get_supabase_service().client.table('brand_kit_orders')\
                 .select('*')\
                 .eq('id', order_id)\
                 .eq('user_id', user_id)\
@@ -415,7 +415,7 @@ class BrandKitService:
             logger.info(f"Processing paid brand kit order {order_id} with payment {payment_reference}")
             
             # Get order details
-            result = await supabase_service.client.table('brand_kit_orders').select(
+            result = await get_supabase_service().client.table('brand_kit_orders').select(
                 'id, user_id, selected_asset_id, order_status, payment_status'
             ).eq('id', order_id).eq('payment_reference', payment_reference).single().execute()
             
@@ -448,7 +448,7 @@ class BrandKitService:
         except Exception as e:
             logger.error(f"Failed to process paid brand kit order {order_id}: {e}")
             # Update order status to failed
-            await supabase_service.client.table('brand_kit_orders').update({
+            await get_supabase_service().client.table('brand_kit_orders').update({
                 'order_status': 'failed',
                 'error_message': str(e)
             }).eq('id', order_id).execute()
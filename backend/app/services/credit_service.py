@@ -6,7 +6,7 @@ Uses secure database functions with atomic transactions.
 
 import logging
 from typing import Optional
-from app.services.supabase_service import supabase_service
+from app.services.supabase_service import get_supabase_service
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +32,7 @@ class CreditService:
             True if user has sufficient credits
         """
         try:
-            result = supabase_service.client.rpc(
+            result = get_supabase_service().client.rpc(
                 'check_user_credits',
                 {
                     'p_user_id': user_id,
@@ -68,7 +68,7 @@ class CreditService:
             True if deduction successful
         """
         try:
-            result = supabase_service.client.rpc(
+            result = get_supabase_service().client.rpc(
                 'deduct_user_credits',
                 {
                     'p_user_id': user_id,
@@ -112,7 +112,7 @@ class CreditService:
         """
         try:
             # Add credits back (negative deduction)
-            result = supabase_service.client.rpc(
+            result = get_supabase_service().client.rpc(
                 'deduct_user_credits',
                 {
                     'p_user_id': user_id,
@@ -146,7 +146,7 @@ class CreditService:
             Credit balance (0 if user not found or error)
         """
         try:
-            result = supabase_service.client.table('user_credits')\
+            result = get_supabase_service().client.table('user_credits')\
                 .select('credits')\
                 .eq('user_id', user_id)\
                 .single()\
@@ -0,0 +1,39 @@
+"""
+Emergency fallback portfolio for APEX-7.
+Kept free of SDK and client imports so scripts can render fallback prompts
+without initialising Gemini or Supabase.
+"""
+import functools
+from typing import Tuple
+
+# Emergency portfolio used when APEX-7 fails; {company}, {initial} and
+# {industry} are filled per brand
+FALLBACK_TEMPLATES: Tuple[str, ...] = (
+    # Studio Helios style
+    "Liquid chrome {company} logo morphing from molten metal, dramatic black mirror surface, caustic reflections, octane render, photorealistic",
+    "Crystal prism logo for {company}, dichroic glass refracting rainbow light, floating in void, ray-traced, luxury product photography",
+    "Carbon fiber {initial} monogram with gold inlay, extreme macro detail, studio lighting, material study, 8K resolution",
+    "Marble sculpture of {company} mark, Carrara white stone, dramatic shadows, architectural photography, museum lighting",
+    "Holographic {company} emblem on black titanium, iridescent surface, product hero shot, professional photography",
+
+    # Studio '78 style
+    "Memphis Group {company} logo, bold geometric shapes, neon colors, playful chaos, vector illustration, Behance",
+    "Swiss Style {company} wordmark, Helvetica Bold, mathematical grid, black on white, minimalist poster design",
+    "Art Deco {company} badge, gold and black, symmetrical ornaments, vintage luxury, graphic design",
+    "Cyberpunk {company} type, neon gradients, glitch effects, retrofuture aesthetic, vector art",
+    "Brutalist {company} mark, concrete texture, bold typography, architectural graphic, editorial design",
+
+    # Studio Apex style
+    "Minimalist {company} symbol using negative space, single continuous line, geometric perfection, brand identity",
+    "Isometric {company} logo construction, clean lines, subtle gradients, modern tech aesthetic, vector design",
+    "Abstract {company} mark, golden ratio proportions, mathematical beauty, clean presentation, minimalist",
+    "Penrose impossible shape forming {initial}, optical illusion, black and white, conceptual design",
+    "Flat design {company} icon, perfect circles and angles, {industry} symbolism, app icon aesthetic"
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def render_fallback_prompts(company: str, industry: str) -> Tuple[str, ...]:
+    """Renders the fallback portfolio; pure in its inputs, so memoized per brand."""
+    values = {"company": company, "initial": company[:1], "industry": industry}
+    return tuple(template.format_map(values) for template in FALLBACK_TEMPLATES)
@@ -0,0 +1,38 @@
+"""
+Shared async HTTP client for outbound calls (fal.ai, image downloads).
+One keep-alive / HTTP/2 connection pool per process instead of one per
+service instance or per request.
+"""
+
+import logging
+from typing import Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide HTTP client, creating it on first use.
+    
+    Returns:
+        Shared httpx.AsyncClient with HTTP/2 and keep-alive pooling
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+        logger.info("Shared HTTP client initialized")
+    return _http_client
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client. Called once at application shutdown."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        logger.info("Shared HTTP client closed")
@@ -6,7 +6,7 @@ Converts Gemini prompts into high-quality logo images.
 import logging
 import asyncio
 import uuid
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set
 import httpx
 import json
 from io import BytesIO
@@ -14,37 +14,116 @@ import base64
 import fal_client
 
 from app.config.settings import settings
-from app.services.supabase_service import SupabaseService
+from app.services.http_client import get_http_client
+from app.services.prompt_engineering_service import prompt_engineering_service
+from app.services.supabase_service import SupabaseService, get_supabase_service
 
 logger = logging.getLogger(__name__)
 
+# Provider responses that will fail every request in a batch (auth, billing).
+# 429 is left out: rate limiting is transient and siblings may still succeed
+_FATAL_STATUS_CODES = frozenset({401, 402, 403})
+
+
+class FatalGenerationError(Exception):
+    """Raised when the image provider rejects a request for auth or billing reasons."""
+
+
+def is_fatal_provider_error(error: BaseException) -> bool:
+    """
+    Checks whether an exception (or anything in its cause chain) is a
+    provider auth/billing rejection rather than a per-request failure.
+    
+    Args:
+        error: Exception raised while generating an image
+        
+    Returns:
+        True if retrying sibling requests is pointless
+    """
+    while error is not None:
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code in _FATAL_STATUS_CODES:
+            return True
+        error = error.__cause__
+    return False
+
+
+# Strong references to in-flight prefetches so they aren't garbage collected
+_prefetch_tasks: Set[asyncio.Task] = set()
+
+
+def prefetch_variation_prompts(asset_ids: List[str], asset_url: str) -> None:
+    """
+    Schedules one variation-prompt analysis for a project's finished logos so
+    a later refinement without a user prompt can skip the Gemini call.
+    
+    A single result is shared by every asset passed in. That is only correct
+    while analyze_logo_for_variations is text-only and never looks at the
+    image (see the TODO there); once it does, analyze and store per asset.
+    
+    Args:
+        asset_ids: IDs of the completed logo assets of one project
+        asset_url: Public URL of one of those logos
+    """
+    if not asset_ids:
+        return
+    task = asyncio.create_task(_store_variation_prompts(asset_ids, asset_url))
+    _prefetch_tasks.add(task)
+    task.add_done_callback(_prefetch_tasks.discard)
+
+
+async def _store_variation_prompts(asset_ids: List[str], asset_url: str) -> None:
+    """Analyzes a logo and saves the neutral variation prompts on the asset rows."""
+    try:
+        variation_prompts = await prompt_engineering_service.analyze_logo_for_variations(
+            logo_url=asset_url,
+            user_prompt=None
+        )
+        await asyncio.to_thread(
+            get_supabase_service().client.table("generated_assets")
+            .update({"cached_variation_prompts": variation_prompts})
+            .in_("id", asset_ids)
+            .execute
+        )
+    except Exception as e:
+        logger.warning(f"Failed to prefetch variation prompts for assets {asset_ids}: {e}")
+
+
 class ImageGenerationService:
     """
     Service for generating logo images using fal.ai's Seedream v4 API.
     Handles image generation, storage upload, and database updates.
     """
     
-    def __init__(self):
-        """Initialize with fal.ai client and Supabase service."""
+    @property
+    def supabase_service(self) -> SupabaseService:
+        """Shared Supabase service; its client is created on first use."""
+        return get_supabase_service()
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Injected client, else the process-wide one looked up per use (it is re-created after shutdown)."""
+        return self._http_client or get_http_client()
+    
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize with fal.ai client and Supabase service.
+        
+        Args:
+            http_client: Shared async HTTP client (defaults to the process-wide client)
+        """
         # Use model IDs from settings for flexibility
         self.text_to_image_model = settings.fal_text_to_image_model
         self.image_to_image_model = settings.fal_image_to_image_model
         self.fal_key = settings.fal_key
-        self.supabase_service = SupabaseService()
         
         # Configure fal_client
         import os
         os.environ["FAL_KEY"] = self.fal_key
         fal_client.api_key = self.fal_key
         
-        # HTTP client with timeout for API calls (fallback)
-        self.http_client = httpx.AsyncClient(
-            timeout=httpx.Timeout(settings.generation_timeout),
-            headers={
-                "Authorization": f"Key {self.fal_key}",
-                "Content-Type": "application/json"
-            }
-        )
+        # Shared pooled HTTP client; fal.ai auth is sent per request (fallback API path)
+        self._http_client = http_client
+        self.fal_headers = {"Authorization": f"Key {self.fal_key}"}
     
     async def generate_initial_concept(
         self,
@@ -227,7 +306,9 @@ class ImageGenerationService:
                 # Make API request to fal.ai
                 response = await self.http_client.post(
                     self.fal_api_url,
-                    json=payload
+                    json=payload,
+                    headers=self.fal_headers,
+                    timeout=settings.generation_timeout
                 )
                 response.raise_for_status()
                 
@@ -313,10 +394,9 @@ class ImageGenerationService:
                 logger.info(f"Generated image URL: {image_url}")
                 
                 # Download the image
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(image_url)
-                    response.raise_for_status()
-                    return response.content
+                response = await self.http_client.get(image_url)
+                response.raise_for_status()
+                return response.content
             else:
                 logger.error("No images in fal.ai response")
                 return None
@@ -341,6 +421,10 @@ class ImageGenerationService:
             
         Returns:
             True if generation and upload successful, False otherwise
+            
+        Raises:
+            FatalGenerationError: If the provider rejected the request for auth
+                or billing reasons (the asset is marked failed first)
         """
         try:
             # Update status to generating
@@ -349,10 +433,9 @@ class ImageGenerationService:
             logger.info(f"Generating variation for asset {asset_id} with prompt: {modification_prompt[:100]}...")
             
             # Download original image
-            async with httpx.AsyncClient() as client:
-                response = await client.get(original_image_url)
-                response.raise_for_status()
-                original_image_data = response.content
+            response = await self.http_client.get(original_image_url)
+            response.raise_for_status()
+            original_image_data = response.content
             
             # Convert to base64 for API
             import base64
@@ -383,10 +466,9 @@ class ImageGenerationService:
                 logger.info(f"Generated variation image URL: {image_url}")
                 
                 # Download the generated image
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(image_url)
-                    response.raise_for_status()
-                    image_data = response.content
+                response = await self.http_client.get(image_url)
+                response.raise_for_status()
+                image_data = response.content
             else:
                 logger.error("No images in variation response")
                 await self.update_asset_status(
@@ -427,16 +509,13 @@ class ImageGenerationService:
                 "failed",
                 error_message=str(e)
             )
+            if is_fatal_provider_error(e):
+                raise FatalGenerationError(str(e)) from e
             return False
     
     async def close(self):
-        """Close HTTP client when service is done."""
-        await self.http_client.aclose()
-    
-    def __del__(self):
-        """Cleanup on garbage collection."""
-        try:
-            if hasattr(self, 'http_client'):
-                asyncio.create_task(self.http_client.aclose())
-        except:
-            pass  # Ignore cleanup errors
\ No newline at end of file
+        """
+        Release service resources. The shared HTTP client is owned by the
+        application and closed once at shutdown, not per service.
+        """
+        pass
@@ -9,7 +9,7 @@ import urllib.parse
 from typing import Dict, Optional, Any
 from datetime import datetime, timedelta
 
-from app.services.supabase_service import supabase_service
+from app.services.supabase_service import get_supabase_service
 from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -52,7 +52,7 @@ class OAuthService:
             }
             
             # Get OAuth URL from Supabase Auth
-            auth_response = supabase_service.client.auth.sign_in_with_oauth({
+            auth_response = get_supabase_service().client.auth.sign_in_with_oauth({
                 'provider': provider,
                 'options': {
                     'redirect_to': f"{settings.supabase_url}/auth/v1/callback?redirect_to={redirect_url}",
@@ -126,7 +126,7 @@ class OAuthService:
                 redirect_url = None
             
             # Exchange code for session using Supabase
-            auth_response = supabase_service.client.auth.exchange_code_for_session({
+            auth_response = get_supabase_service().client.auth.exchange_code_for_session({
                 'auth_code': code
             })
             
@@ -173,7 +173,7 @@ class OAuthService:
         """
         try:
             # Refresh session using Supabase
-            auth_response = supabase_service.client.auth.refresh_session(refresh_token)
+            auth_response = get_supabase_service().client.auth.refresh_session(refresh_token)
             
             if not auth_response.user or not auth_response.session:
                 raise Exception("Failed to refresh OAuth token")
@@ -214,10 +214,10 @@ class OAuthService:
         """
         try:
             # Set the session for the client
-            supabase_service.client.auth.set_session(access_token, None)
+            get_supabase_service().client.auth.set_session(access_token, None)
             
             # Sign out the user
-            supabase_service.client.auth.sign_out()
+            get_supabase_service().client.auth.sign_out()
             
             logger.info("OAuth session revoked successfully")
             return True
@@ -235,7 +235,7 @@ class OAuthService:
         """
         try:
             # Check if user already exists
-            existing_user = await supabase_service.client.table('users').select('*').eq('id', user_info['id']).execute()
+            existing_user = await get_supabase_service().client.table('users').select('*').eq('id', user_info['id']).execute()
             
             user_data = {
                 'id': user_info['id'],
@@ -248,13 +248,13 @@ class OAuthService:
             
             if existing_user.data:
                 # Update existing user
-                await supabase_service.client.table('users').update(user_data).eq('id', user_info['id']).execute()
+                await get_supabase_service().client.table('users').update(user_data).eq('id', user_info['id']).execute()
                 logger.info(f"Updated OAuth user record for {user_info['email']}")
             else:
                 # Create new user
                 user_data['created_at'] = datetime.utcnow().isoformat()
                 user_data['credits'] = 100  # Give new OAuth users 100 credits
-                await supabase_service.client.table('users').insert(user_data).execute()
+                await get_supabase_service().client.table('users').insert(user_data).execute()
                 logger.info(f"Created new OAuth user record for {user_info['email']}")
                 
         except Exception as e:
@@ -5,30 +5,48 @@ Manages the sequence: Project → Inspiration Analysis → Prompts → 15 Logos
 
 import logging
 import asyncio
+import functools
+import os
 import uuid
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import httpx
+from typing import Dict, Any, List, Optional, Set
 
 from app.services.image_generation_service import ImageGenerationService
-from app.services.prompt_engineering_service import PromptEngineeringService
-from app.services.supabase_service import SupabaseService
+from app.services.batch_image_generation_service import BatchImageGenerationService
+from app.services.prompt_engineering_service import prompt_engineering_service
+from app.services.supabase_service import SupabaseService, get_supabase_service
 from app.models.schemas import BrandInfo
 from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Strong references to fire-and-forget tasks so they aren't garbage collected
+# mid-flight. Module level because orchestrators are created per request.
+_background_tasks: Set[asyncio.Task] = set()
+
 class OrchestratorService:
     """
     Service that orchestrates the complete AI workflow for logo generation.
     Coordinates APEX-7 prompt generation and Seedream image generation.
     """
     
-    def __init__(self):
-        """Initialize with AI services and database connection."""
+    @property
+    def supabase_service(self) -> SupabaseService:
+        """Shared Supabase service; its client is created on first use."""
+        return get_supabase_service()
+    
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize with AI services and database connection.
+        
+        Args:
+            http_client: Shared async HTTP client injected into the image services
+                (defaults to the process-wide client)
+        """
         # APEX-7 handles all Gemini interactions (prompts + image analysis)
-        self.prompt_service = PromptEngineeringService()
-        self.image_service = ImageGenerationService()
-        self.supabase_service = SupabaseService()
+        self.prompt_service = prompt_engineering_service
+        self.image_service = ImageGenerationService(http_client=http_client)
+        self.batch_service = BatchImageGenerationService(http_client=http_client)
     
     async def start_logo_generation(self, project_id: str) -> None:
         """
@@ -46,7 +64,7 @@ class OrchestratorService:
         6. Monitor progress and handle errors
         """
         try:
-            logger.info(f"Starting logo generation workflow for project {project_id}")
+            logger.info("Starting logo generation workflow for project %s", project_id)
             
             # Step 1: Get project data
             project_data = await self._get_project_data(project_id)
@@ -59,10 +77,11 @@ class OrchestratorService:
             if project_data.get("inspiration_image_url"):
                 logger.info("Analyzing inspiration image...")
                 # APEX-7 service handles image analysis
-                inspiration_analysis = await self.prompt_service.analyze_inspiration_image(
+                inspiration_url = await self.supabase_service.resolve_inspiration_url(
                     project_data["inspiration_image_url"]
                 )
-                logger.info(f"Inspiration analysis: {inspiration_analysis[:100]}...")
+                inspiration_analysis = await self.prompt_service.analyze_inspiration_image(inspiration_url)
+                logger.info("Inspiration analysis: %.100s...", inspiration_analysis)
             
             # Step 3: Generate 15 diverse prompts using APEX-7 Multi-Studio Framework
             logger.info("🎨 Invoking APEX-7 Creative Direction Engine...")
@@ -77,7 +96,8 @@ class OrchestratorService:
                 inspirations=[{"analysis": inspiration_analysis}] if inspiration_analysis else []
             )
             
-            prompts = self.prompt_service.generate_prompts(brand_info)
+            # Identical briefs (e.g. retries) reuse the cached portfolio
+            prompts = await self.prompt_service.generate_prompts(brand_info)
             
             if len(prompts) != 15:
                 logger.warning(f"Expected 15 prompts, got {len(prompts)}")
@@ -90,22 +110,69 @@ class OrchestratorService:
                 return
             
             # Step 5: Use batch generation service for better performance
-            logger.info(f"Launching APEX-7 Portfolio Generation: {len(prompts)} concepts...")
-            
-            # Import here to avoid circular dependency
-            from app.services.batch_image_generation_service import BatchImageGenerationService
-            batch_service = BatchImageGenerationService()
+            logger.info("Launching APEX-7 Portfolio Generation: %d concepts...", len(prompts))
             
             # Launch batch generation as background task
-            asyncio.create_task(
-                batch_service.generate_logos_batch(prompts, asset_ids, project_id)
+            task = asyncio.create_task(
+                self.batch_service.generate_logos_batch(prompts, asset_ids, project_id)
+            )
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+            task.add_done_callback(
+                functools.partial(self._on_batch_done, project_id=project_id, asset_ids=asset_ids)
             )
             
-            logger.info(f"✅ APEX-7 Creative Portfolio workflow initiated for project {project_id}")
+            logger.info("✅ APEX-7 Creative Portfolio workflow initiated for project %s", project_id)
             
         except Exception as e:
             logger.error(f"Failed to start logo generation for project {project_id}: {str(e)}")
     
+    def _on_batch_done(self, task: asyncio.Task, project_id: str, asset_ids: List[str]) -> None:
+        """
+        Done-callback for the batch generation task. Surfaces crashes in the logs
+        and marks unfinished assets as failed so clients stop polling.
+        
+        Args:
+            task: Finished batch generation task
+            project_id: ID of the project being generated
+            asset_ids: Asset IDs handled by the batch
+        """
+        if task.cancelled():
+            error_message = "Batch generation was cancelled"
+        elif task.exception() is not None:
+            error_message = f"Batch generation crashed: {task.exception()}"
+        else:
+            return
+        
+        logger.error("Batch generation for project %s failed: %s", project_id, error_message)
+        
+        cleanup = asyncio.create_task(self._mark_assets_failed(asset_ids, error_message))
+        _background_tasks.add(cleanup)
+        cleanup.add_done_callback(_background_tasks.discard)
+    
+    async def _mark_assets_failed(self, asset_ids: List[str], error_message: str) -> None:
+        """
+        Mark every asset that has not finished generating as failed.
+        
+        Args:
+            asset_ids: Asset IDs to update
+            error_message: Error stored on each asset
+        """
+        try:
+            result = await asyncio.to_thread(
+                self.supabase_service.client.table("generated_assets").update({
+                    "status": "failed",
+                    "error_message": error_message,
+                    "updated_at": "now()"
+                }).in_("id", asset_ids).in_("status", ["pending", "generating"]).execute
+            )
+            
+            if hasattr(result, 'error') and result.error:
+                logger.error(f"Failed to mark assets as failed: {result.error}")
+                
+        except Exception as e:
+            logger.error(f"Failed to mark assets as failed: {str(e)}")
+    
     async def _get_project_data(self, project_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve project data from database.
@@ -151,14 +218,19 @@ class OrchestratorService:
             List of asset IDs created
         """
         try:
-            asset_ids = []
             asset_entries = []
             
+            # Read randomness for every asset ID in one syscall instead of one per uuid4()
+            random_bytes = os.urandom(16 * len(prompts))
+            asset_ids = [
+                str(uuid.UUID(bytes=random_bytes[i * 16:(i + 1) * 16], version=4))
+                for i in range(len(prompts))
+            ]
+            
             # Generate asset type sequence based on archetype distribution
             asset_type_sequence = self._generate_asset_type_sequence()
             
-            for i, prompt in enumerate(prompts):
-                asset_id = str(uuid.uuid4())
+            for i, (prompt, asset_id) in enumerate(zip(prompts, asset_ids)):
                 asset_type = asset_type_sequence[i] if i < len(asset_type_sequence) else "abstract_mark"
                 
                 asset_entry = {
@@ -169,13 +241,11 @@ class OrchestratorService:
                     "status": "pending",
                     "asset_url": None,
                     "generation_prompt": prompt,
-                    "error_message": None,
-                    "created_at": datetime.utcnow().isoformat(),
-                    "updated_at": datetime.utcnow().isoformat()
+                    "error_message": None
+                    # created_at / updated_at are filled in by column defaults
                 }
                 
                 asset_entries.append(asset_entry)
-                asset_ids.append(asset_id)
             
             # Batch insert all assets
             result = self.supabase_service.client.table("generated_assets").insert(
@@ -186,7 +256,7 @@ class OrchestratorService:
                 logger.error(f"Failed to create asset entries: {result.error}")
                 return []
             
-            logger.info(f"Created {len(asset_ids)} asset entries for project {project_id}")
+            logger.info("Created %d asset entries for project %s", len(asset_ids), project_id)
             return asset_ids
             
         except Exception as e:
@@ -244,7 +314,7 @@ class OrchestratorService:
             # This allows the main request to return while generation continues
             asyncio.create_task(self._monitor_generation_tasks(tasks, asset_ids))
             
-            logger.info(f"Launched {len(tasks)} generation tasks")
+            logger.info("Launched %d generation tasks", len(tasks))
             
         except Exception as e:
             logger.error(f"Failed to launch generation tasks: {str(e)}")
@@ -272,7 +342,8 @@ class OrchestratorService:
             failures = len(results) - successes
             
             logger.info(
-                f"Generation complete: {successes} successful, {failures} failed out of {len(results)} total"
+                "Generation complete: %d successful, %d failed out of %d total",
+                successes, failures, len(results)
             )
             
             # Log individual failures for debugging
@@ -332,7 +403,10 @@ class OrchestratorService:
             return {"error": str(e)}
     
     async def cleanup(self):
-        """Cleanup resources when orchestrator is done."""
+        """
+        Cleanup resources when orchestrator is done.
+        The shared HTTP client itself is closed at application shutdown.
+        """
         try:
             await self.image_service.close()
         except Exception as e:
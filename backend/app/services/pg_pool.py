@@ -0,0 +1,111 @@
+"""
+Direct Postgres pool for hot-path reads.
+Bypasses PostgREST (HTTP, JSON and auth middleware) for the most frequent
+owner-scoped lookups. Only used when SUPABASE_DB_URL is configured; writes
+stay on PostgREST.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import date, datetime
+from typing import Any, Dict
+from uuid import UUID
+
+import orjson
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_pg_pool = None
+_pool_lock = asyncio.Lock()
+
+# After a failed pool creation, reads go straight to PostgREST for this long
+# instead of each one queueing behind another connect attempt
+_POOL_RETRY_BACKOFF = 300
+_pool_failed_at = float("-inf")
+
+
+async def _init_connection(connection) -> None:
+    """Decode json/jsonb columns into Python objects, as PostgREST does."""
+    for type_name in ("json", "jsonb"):
+        await connection.set_type_codec(
+            type_name,
+            encoder=lambda value: orjson.dumps(value).decode(),
+            decoder=orjson.loads,
+            schema="pg_catalog"
+        )
+
+
+async def get_pg_pool():
+    """
+    Get the process-wide asyncpg pool, creating it on first use.
+
+    Returns:
+        asyncpg.Pool, or None when no database URL is configured or the
+        pool could not be created recently (callers fall back to PostgREST)
+    """
+    global _pg_pool, _pool_failed_at
+    if not settings.supabase_db_url:
+        return None
+    if _pg_pool is None:
+        if time.monotonic() - _pool_failed_at < _POOL_RETRY_BACKOFF:
+            return None
+        async with _pool_lock:
+            # Waiters queued behind a failed attempt see it here and back off too
+            if _pg_pool is None and time.monotonic() - _pool_failed_at < _POOL_RETRY_BACKOFF:
+                return None
+            if _pg_pool is None:
+                try:
+                    import asyncpg
+
+                    # Sized well under Supabase's direct-connection limit, and
+                    # safe behind the transaction-mode pooler: no statement
+                    # cache, idle connections recycled, bounded waits
+                    _pg_pool = await asyncpg.create_pool(
+                        settings.supabase_db_url,
+                        min_size=1,
+                        max_size=settings.pg_pool_max_size,
+                        statement_cache_size=0,
+                        max_cached_statement_lifetime=0,
+                        max_inactive_connection_lifetime=1800,
+                        timeout=30,
+                        command_timeout=30,
+                        init=_init_connection
+                    )
+                    logger.info("Postgres pool initialized")
+                except Exception as e:
+                    _pool_failed_at = time.monotonic()
+                    logger.error(f"Failed to create Postgres pool, using PostgREST for {_POOL_RETRY_BACKOFF}s: {e}")
+                    return None
+    return _pg_pool
+
+
+async def close_pg_pool() -> None:
+    """Close the Postgres pool, if one was opened."""
+    global _pg_pool
+    if _pg_pool is not None:
+        await _pg_pool.close()
+        _pg_pool = None
+        logger.info("Postgres pool closed")
+
+
+def record_to_dict(record) -> Dict[str, Any]:
+    """
+    Convert an asyncpg record to the JSON-shaped dict PostgREST would return.
+
+    Args:
+        record: asyncpg.Record
+
+    Returns:
+        Dict with UUIDs as strings and timestamps in ISO 8601
+    """
+    row: Dict[str, Any] = {}
+    for key, value in record.items():
+        if isinstance(value, UUID):
+            value = str(value)
+        elif isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        row[key] = value
+    return row
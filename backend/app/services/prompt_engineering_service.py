@@ -2,16 +2,62 @@
 APEX-7 Creative Direction Engine for LogoKraft
 Multi-Studio Framework for Elite Brand Concept Generation
 """
+import functools
+import hashlib
 import json
 import logging
-from typing import List, Dict, Any, Optional
+import re
+from typing import List, Dict, Any, Optional, Tuple
 import google.generativeai as genai
+import orjson
+from cachetools import TTLCache
 
 from app.config.settings import settings
 from app.models.schemas import BrandInfo, CreativeBrief
+from app.services.fallback_prompts import render_fallback_prompts
 
 logger = logging.getLogger(__name__)
 
+# Configure the Gemini SDK once per process rather than per service instance
+genai.configure(api_key=settings.google_api_key)
+_MODEL: Optional[genai.GenerativeModel] = None
+
+
+def _get_model() -> genai.GenerativeModel:
+    """Returns the process-wide Gemini model, creating it on first use."""
+    global _MODEL
+    if _MODEL is None:
+        _MODEL = genai.GenerativeModel(settings.gemini_model)
+    return _MODEL
+
+# Generated portfolios keyed by a hash of the brand brief. Services are
+# instantiated per request, so the cache lives at module level.
+_PROMPT_CACHE: TTLCache = TTLCache(maxsize=512, ttl=3600)
+
+# Studio-specific quality keywords appended to every generated prompt
+_STUDIO_SIGNATURES: Dict[str, str] = {
+    "Helios": ", octane render, photorealistic, studio lighting, 8K resolution",
+    "'78": ", graphic design, vector illustration, Behance, editorial design",
+    "Apex": ", minimalist design, brand identity, clean aesthetic, professional"
+}
+_DEFAULT_SIGNATURE = ", high quality, professional design"
+
+# Keyword detectors used to classify a prompt by studio
+_HELIOS_RE = re.compile(r"octane|photorealistic|8k|liquid|glass", re.IGNORECASE)
+_SEVENTYEIGHT_RE = re.compile(r"memphis|swiss|graphic design|vector illustration", re.IGNORECASE)
+
+# Decodes one JSON value at a given offset of the streamed portfolio
+_JSON_DECODER = json.JSONDecoder()
+
+# Design-principle-based refinement variations; {base} is the user request
+_VARIATION_TEMPLATES: Tuple[str, ...] = (
+    "Refined minimalist interpretation: {base}, clean lines, reduced visual noise, increased white space, sophisticated simplicity",
+    "Bold contemporary approach: {base}, stronger visual impact, modern typography, confident proportions, premium aesthetic",
+    "Organic flowing evolution: {base}, softer edges, natural curves, humanized geometry, approachable warmth",
+    "Technical precision enhancement: {base}, mathematical perfection, grid-based alignment, systematic proportions, engineering elegance",
+    "Dynamic energy variation: {base}, implied movement, directional elements, rhythmic composition, forward momentum"
+)
+
 class PromptEngineeringService:
     """
     The APEX-7 Creative Direction Engine. Translates a client's core business
@@ -20,15 +66,12 @@ class PromptEngineeringService:
     """
     
     # THE MASTER SYSTEM PROMPT - APEX-7 MULTI-STUDIO FRAMEWORK
-    META_PROMPT_TEMPLATE = """
+    # Stable part: identical on every call and never format-substituted, so it
+    # is sent first as its own content part and can be served from the
+    # provider's prefix cache.
+    _STABLE_PROMPT = """
 You are APEX-7, a legendary AI Creative Direction Engine, the strategic core of a world-class design agency. You do not generate simple prompts; you develop and articulate complete brand concepts. Your task is to create a portfolio of 15 distinct and audacious brand concepts for a client by intelligently combining conceptual strategies and artistic executions.
 
-**Brand Information (Your Only Input):**
-- **Company Name:** {company_name}
-- **Industry:** {industry}
-- **Description:** {description}
-- **Inspiration Analysis:** {inspiration_analysis}
-
 **YOUR MANDATE: THE 15 MASTERPIECES PORTFOLIO**
 
 Generate exactly 15 prompts by creating 5 Core Brand Concepts, each executed through 3 different Design Studios.
@@ -79,32 +122,47 @@ Generate exactly 15 prompts by creating 5 Core Brand Concepts, each executed thr
 **OUTPUT FORMAT:**
 Return ONLY a valid JSON object:
 ```json
-{{
+{
   "portfolio": [
-    {{
+    {
       "concept_title": "Quantum Fortress",
       "execution_prompts": [
-        {{"studio": "Helios", "prompt": "Liquid mercury logo for CyberVault..."}},
-        {{"studio": "'78", "prompt": "Bold Memphis Group composition..."}},
-        {{"studio": "Apex", "prompt": "Minimalist geometric mark..."}}
+        {"studio": "Helios", "prompt": "Liquid mercury logo for CyberVault..."},
+        {"studio": "'78", "prompt": "Bold Memphis Group composition..."},
+        {"studio": "Apex", "prompt": "Minimalist geometric mark..."}
       ]
-    }},
+    },
     // ... 4 more concepts with 3 prompts each
   ]
-}}
+}
 ```
 
 CRITICAL: You MUST return exactly 5 concepts with exactly 3 prompts each = 15 total prompts.
 """
 
-    def __init__(self):
-        """Initialize the APEX-7 Creative Direction Engine"""
-        genai.configure(api_key=settings.google_api_key)
-        self.model = genai.GenerativeModel(settings.gemini_model)
+    # Dynamic part: the only per-brand input, sent after the stable prefix
+    _DYNAMIC_PROMPT_TEMPLATE = """
+**Brand Information (Your Only Input):**
+- **Company Name:** {company_name}
+- **Industry:** {industry}
+- **Description:** {description}
+- **Inspiration Analysis:** {inspiration_analysis}
+
+Generate the 15-prompt portfolio for this brand now.
+"""
+
+    # Bound formatter for the per-brand template, filled from a prebuilt dict
+    _format_dynamic_prompt = _DYNAMIC_PROMPT_TEMPLATE.format_map
 
-    def generate_prompts(self, brand_info: BrandInfo) -> List[str]:
+    @functools.cached_property
+    def model(self) -> genai.GenerativeModel:
+        """Shared Gemini model used by the APEX-7 Creative Direction Engine"""
+        return _get_model()
+
+    async def generate_prompts(self, brand_info: BrandInfo) -> List[str]:
         """
         Generates 15 prompts from the brand info using the APEX-7 multi-studio framework.
+        A cached portfolio for the same brand fields is returned without calling Gemini.
         
         Args:
             brand_info: Core brand information from the client
@@ -112,54 +170,21 @@ CRITICAL: You MUST return exactly 5 concepts with exactly 3 prompts each = 15 to
         Returns:
             List of 15 elite creative prompts
         """
-        
-        # Format inspiration analysis
-        inspiration_text = "No specific visual references provided. Full creative freedom to explore."
-        if brand_info.inspirations:
-            inspiration_texts = []
-            for insp in brand_info.inspirations:
-                if insp.get("analysis"):
-                    inspiration_texts.append(insp["analysis"])
-            if inspiration_texts:
-                inspiration_text = " | ".join(inspiration_texts)
-
-        # Build the APEX-7 meta-prompt
-        meta_prompt = self.META_PROMPT_TEMPLATE.format(
-            company_name=brand_info.company_name,
-            industry=brand_info.industry,
-            description=brand_info.description or f"A leading company in the {brand_info.industry} sector.",
-            inspiration_analysis=inspiration_text
-        )
+        inspiration_text = self._format_inspiration(brand_info)
+
+        cache_key = self._brand_cache_key(brand_info, inspiration_text)
+        if cache_key in _PROMPT_CACHE:
+            logger.info(f"♻️ Reusing cached APEX-7 portfolio for '{brand_info.company_name}'")
+            return list(_PROMPT_CACHE[cache_key])
+
+        # Build the per-brand part of the APEX-7 meta-prompt
+        brand_prompt = self._format_dynamic_prompt(self._brand_fields(brand_info, inspiration_text))
 
         logger.info(f"🎨 Invoking APEX-7 Creative Direction for '{brand_info.company_name}'...")
         
         try:
-            # Generate the portfolio using Gemini
-            response = self.model.generate_content(
-                meta_prompt,
-                generation_config={
-                    "temperature": 0.9,  # High creativity for diverse concepts
-                    "max_output_tokens": 8192,
-                    "response_mime_type": "application/json"
-                }
-            )
-            
-            # Parse the structured portfolio
-            portfolio_data = json.loads(response.text)
-            
-            # Flatten the structured portfolio into a simple list of 15 prompts
-            flat_prompts = []
-            for concept in portfolio_data.get("portfolio", []):
-                concept_title = concept.get("concept_title", "Untitled Concept")
-                logger.debug(f"  📋 Processing concept: {concept_title}")
-                
-                for execution in concept.get("execution_prompts", []):
-                    studio = execution.get("studio", "Unknown")
-                    prompt = execution.get("prompt", "")
-                    if prompt:
-                        # Add studio signature to each prompt for variety
-                        enhanced_prompt = self._enhance_prompt_with_studio_signature(prompt, studio)
-                        flat_prompts.append(enhanced_prompt)
+            # Stream the portfolio from Gemini and stop once 15 prompts have arrived
+            flat_prompts = await self._stream_portfolio_prompts(brand_prompt)
             
             if not flat_prompts:
                 raise ValueError("APEX-7 returned an empty portfolio.")
@@ -171,6 +196,7 @@ CRITICAL: You MUST return exactly 5 concepts with exactly 3 prompts each = 15 to
                 flat_prompts.extend(self._get_fallback_prompts(brand_info)[:15 - len(flat_prompts)])
             
             logger.info(f"✅ APEX-7 successfully generated portfolio of {len(flat_prompts)} concepts.")
+            _PROMPT_CACHE[cache_key] = tuple(flat_prompts[:15])
             return flat_prompts[:15]
 
         except Exception as e:
@@ -178,6 +204,125 @@ CRITICAL: You MUST return exactly 5 concepts with exactly 3 prompts each = 15 to
             logger.info("Falling back to emergency creative prompts...")
             return self._get_fallback_prompts(brand_info)
 
+    async def _stream_portfolio_prompts(self, brand_prompt: str) -> List[str]:
+        """
+        Streams the APEX-7 portfolio and collects execution prompts as they complete.
+        Stops consuming the stream as soon as 15 prompts are collected, so the
+        caller doesn't wait for (or decode) any over-generated output.
+        
+        Args:
+            brand_prompt: Formatted per-brand part of the meta-prompt
+            
+        Returns:
+            Up to 15 studio-signed prompts
+        """
+        response = await self.model.generate_content_async(
+            [self._STABLE_PROMPT, brand_prompt],
+            generation_config={
+                "temperature": 0.9,  # High creativity for diverse concepts
+                "max_output_tokens": 8192,
+                "response_mime_type": "application/json"
+            },
+            stream=True
+        )
+        
+        buffer = ""
+        scan_from = 0
+        flat_prompts = []
+        chunks = aiter(response)
+        try:
+            async for chunk in chunks:
+                try:
+                    buffer += chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. the final finish_reason chunk)
+                    continue
+                
+                # Try each object start after the last collected prompt. Enclosing
+                # portfolio/concept objects don't decode until the stream ends (or
+                # carry no "prompt"), so the scan steps inside them; a decoded
+                # {"studio": ..., "prompt": ...} object is collected and skipped whole,
+                # braces inside its strings included
+                pos = buffer.find("{", scan_from)
+                while pos != -1:
+                    try:
+                        execution, end = _JSON_DECODER.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        pos = buffer.find("{", pos + 1)
+                        continue
+                    
+                    prompt = execution.get("prompt") if isinstance(execution, dict) else None
+                    if not isinstance(prompt, str) or not prompt:
+                        pos = buffer.find("{", pos + 1)
+                        continue
+                    
+                    # Add studio signature to each prompt for variety
+                    flat_prompts.append(
+                        self._enhance_prompt_with_studio_signature(prompt, execution.get("studio", "Unknown"))
+                    )
+                    if len(flat_prompts) == 15:
+                        return flat_prompts
+                    scan_from = end
+                    pos = buffer.find("{", end)
+        finally:
+            # Returning early leaves the response stream open; close it (and the
+            # underlying API stream) instead of waiting for garbage collection
+            await chunks.aclose()
+            upstream = getattr(response, "_iterator", None)
+            if hasattr(upstream, "aclose"):
+                await upstream.aclose()
+        
+        return flat_prompts
+
+    def _format_inspiration(self, brand_info: BrandInfo) -> str:
+        """
+        Joins the inspiration analyses into the text used by the meta-prompt.
+        
+        Args:
+            brand_info: Core brand information from the client
+            
+        Returns:
+            Combined inspiration analysis, or a free-exploration note
+        """
+        return " | ".join(
+            insp["analysis"] for insp in brand_info.inspirations or () if insp.get("analysis")
+        ) or "No specific visual references provided. Full creative freedom to explore."
+
+    def _format_description(self, brand_info: BrandInfo) -> str:
+        """Company description, or a generic one derived from the industry."""
+        return brand_info.description or f"A leading company in the {brand_info.industry} sector."
+
+    def _brand_fields(self, brand_info: BrandInfo, inspiration_text: str) -> Dict[str, str]:
+        """Placeholder values for the per-brand meta-prompt templates."""
+        return {
+            "company_name": brand_info.company_name,
+            "industry": brand_info.industry,
+            "description": self._format_description(brand_info),
+            "inspiration_analysis": inspiration_text
+        }
+
+    def _brand_cache_key(self, brand_info: BrandInfo, inspiration_text: str) -> str:
+        """
+        Builds a stable hash of everything that shapes the meta-prompt.
+        
+        Args:
+            brand_info: Core brand information from the client
+            inspiration_text: Formatted inspiration analysis
+            
+        Returns:
+            Hex digest used as the portfolio cache key
+        """
+        payload = json.dumps(
+            {
+                "c": brand_info.company_name,
+                "i": brand_info.industry,
+                "d": brand_info.description,
+                "insp": inspiration_text
+            },
+            sort_keys=True
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
     def _enhance_prompt_with_studio_signature(self, prompt: str, studio: str) -> str:
         """
         Adds studio-specific quality keywords to enhance prompt effectiveness.
@@ -189,14 +334,7 @@ CRITICAL: You MUST return exactly 5 concepts with exactly 3 prompts each = 15 to
         Returns:
             Enhanced prompt with studio signature
         """
-        studio_signatures = {
-            "Helios": ", octane render, photorealistic, studio lighting, 8K resolution",
-            "'78": ", graphic design, vector illustration, Behance, editorial design", 
-            "Apex": ", minimalist design, brand identity, clean aesthetic, professional"
-        }
-        
-        signature = studio_signatures.get(studio, ", high quality, professional design")
-        return f"{prompt}{signature}"
+        return prompt + _STUDIO_SIGNATURES.get(studio, _DEFAULT_SIGNATURE)
 
     def _get_fallback_prompts(self, brand_info: BrandInfo) -> List[str]:
         """
@@ -209,34 +347,7 @@ CRITICAL: You MUST return exactly 5 concepts with exactly 3 prompts each = 15 to
         Returns:
             List of 15 fallback prompts
         """
-        company = brand_info.company_name
-        industry = brand_info.industry
-        
-        # Elite fallback prompts with variety
-        fallback_prompts = [
-            # Studio Helios style
-            f"Liquid chrome {company} logo morphing from molten metal, dramatic black mirror surface, caustic reflections, octane render, photorealistic",
-            f"Crystal prism logo for {company}, dichroic glass refracting rainbow light, floating in void, ray-traced, luxury product photography",
-            f"Carbon fiber {company[0]} monogram with gold inlay, extreme macro detail, studio lighting, material study, 8K resolution",
-            f"Marble sculpture of {company} mark, Carrara white stone, dramatic shadows, architectural photography, museum lighting",
-            f"Holographic {company} emblem on black titanium, iridescent surface, product hero shot, professional photography",
-            
-            # Studio '78 style  
-            f"Memphis Group {company} logo, bold geometric shapes, neon colors, playful chaos, vector illustration, Behance",
-            f"Swiss Style {company} wordmark, Helvetica Bold, mathematical grid, black on white, minimalist poster design",
-            f"Art Deco {company} badge, gold and black, symmetrical ornaments, vintage luxury, graphic design",
-            f"Cyberpunk {company} type, neon gradients, glitch effects, retrofuture aesthetic, vector art",
-            f"Brutalist {company} mark, concrete texture, bold typography, architectural graphic, editorial design",
-            
-            # Studio Apex style
-            f"Minimalist {company} symbol using negative space, single continuous line, geometric perfection, brand identity",
-            f"Isometric {company} logo construction, clean lines, subtle gradients, modern tech aesthetic, vector design",
-            f"Abstract {company} mark, golden ratio proportions, mathematical beauty, clean presentation, minimalist",
-            f"Penrose impossible shape forming {company[0]}, optical illusion, black and white, conceptual design",
-            f"Flat design {company} icon, perfect circles and angles, {industry} symbolism, app icon aesthetic"
-        ]
-        
-        return fallback_prompts[:15]
+        return list(render_fallback_prompts(brand_info.company_name, brand_info.industry))
 
     async def analyze_logo_for_variations(self, logo_url: str, user_prompt: Optional[str] = None) -> List[str]:
         """
@@ -280,8 +391,13 @@ CRITICAL: You MUST return exactly 5 concepts with exactly 3 prompts each = 15 to
             # For now, we'll use the text-based model since multimodal implementation
             # requires additional setup. This creates intelligent fallback prompts.
             # TODO: Implement actual image analysis with Gemini Pro Vision
+            # When this sends the image, the result becomes logo specific: the
+            # batch prefetch (image_generation_service.prefetch_variation_prompts)
+            # shares one result across a whole project and must then analyze each
+            # asset separately, and rows already holding shared
+            # cached_variation_prompts must be cleared
             
-            response = self.model.generate_content(
+            response = await self.model.generate_content_async(
                 analysis_prompt,
                 generation_config={
                     "temperature": 0.8,  # Creative but focused
@@ -290,11 +406,14 @@ CRITICAL: You MUST return exactly 5 concepts with exactly 3 prompts each = 15 to
                 }
             )
             
-            import json
-            variation_prompts = json.loads(response.text)
+            variation_prompts = orjson.loads(response.text)
             
-            if isinstance(variation_prompts, list) and len(variation_prompts) >= 5:
-                logger.info(f"✅ Generated {len(variation_prompts[:5])} intelligent variation prompts")
+            if (
+                isinstance(variation_prompts, list)
+                and len(variation_prompts) >= 5
+                and all(isinstance(p, str) for p in variation_prompts[:5])
+            ):
+                logger.info("✅ Generated 5 intelligent variation prompts")
                 return variation_prompts[:5]
             else:
                 logger.warning("Gemini response format unexpected, using fallback")
@@ -314,16 +433,9 @@ CRITICAL: You MUST return exactly 5 concepts with exactly 3 prompts each = 15 to
         Returns:
             List of 5 design-principle-based variation prompts
         """
-        base_request = user_prompt or "professional design refinement"
-        
         # Design-principle-based variations
-        intelligent_variations = [
-            f"Refined minimalist interpretation: {base_request}, clean lines, reduced visual noise, increased white space, sophisticated simplicity",
-            f"Bold contemporary approach: {base_request}, stronger visual impact, modern typography, confident proportions, premium aesthetic", 
-            f"Organic flowing evolution: {base_request}, softer edges, natural curves, humanized geometry, approachable warmth",
-            f"Technical precision enhancement: {base_request}, mathematical perfection, grid-based alignment, systematic proportions, engineering elegance",
-            f"Dynamic energy variation: {base_request}, implied movement, directional elements, rhythmic composition, forward momentum"
-        ]
+        values = {"base": user_prompt or "professional design refinement"}
+        intelligent_variations = [template.format_map(values) for template in _VARIATION_TEMPLATES]
         
         logger.info("Using intelligent design-principle-based fallback variations")
         return intelligent_variations
@@ -373,9 +485,9 @@ CRITICAL: You MUST return exactly 5 concepts with exactly 3 prompts each = 15 to
             CreativeBrief object with parsed information
         """
         # Detect studio based on keywords
-        if any(word in prompt.lower() for word in ["octane", "photorealistic", "8k", "liquid", "glass"]):
+        if _HELIOS_RE.search(prompt):
             studio = "Helios"
-        elif any(word in prompt.lower() for word in ["memphis", "swiss", "graphic design", "vector illustration"]):
+        elif _SEVENTYEIGHT_RE.search(prompt):
             studio = "'78"
         else:
             studio = "Apex"
@@ -387,4 +499,8 @@ CRITICAL: You MUST return exactly 5 concepts with exactly 3 prompts each = 15 to
             concept_title=concept_title,
             studio=studio,
             prompt=prompt
-        )
\ No newline at end of file
+        )
+
+
+# Global service instance
+prompt_engineering_service = PromptEngineeringService()
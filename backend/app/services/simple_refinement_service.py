@@ -4,15 +4,129 @@ Handles the focused logo refinement flow: 1 logo + prompt → 5 variations
 """
 
 import asyncio
+import functools
+import hashlib
 import logging
-from typing import Dict, List, Any, Optional
-from app.services.image_generation_service import ImageGenerationService
-from app.services.prompt_engineering_service import PromptEngineeringService
+import re
+import weakref
+from typing import Dict, List, Any, Optional, FrozenSet, Set, Tuple
+from cachetools import TTLCache
+from postgrest.exceptions import APIError
+
+from app.config.settings import settings
+from app.services.image_generation_service import ImageGenerationService, FatalGenerationError
+from app.services.prompt_engineering_service import prompt_engineering_service
 from app.services.credit_service import credit_service
-from app.services.supabase_service import supabase_service
+from app.services.supabase_service import get_supabase_service
 
 logger = logging.getLogger(__name__)
 
+# Strong references to the refinement monitors so they aren't garbage collected
+# mid-flight; each monitor in turn holds its variation tasks
+_background_tasks: Set[asyncio.Task] = set()
+
+# Filler words that don't change what a refinement request asks for
+_PROMPT_STOPWORDS = frozenset({
+    "a", "an", "the", "it", "its", "it's", "make", "more", "please", "bit", "little",
+    "slightly", "some", "somewhat", "very", "much", "and", "with", "to", "of", "look", "logo"
+})
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Design-principle-based variations that work with any logo prompt
+_VARIATION_SUFFIXES: Tuple[str, ...] = (
+    "minimalist approach with clean lines and increased white space",
+    "bold contemporary style with stronger visual impact",
+    "organic flowing interpretation with softer edges and curves",
+    "technical precision enhancement with mathematical proportions",
+    "dynamic modern evolution with implied movement and energy"
+)
+
+
+@functools.lru_cache(maxsize=2048)
+def _prompt_based_variations(original_prompt: str, user_prompt: Optional[str]) -> Tuple[str, ...]:
+    """Builds (and memoizes) the design-principle fallback variations for a prompt pair."""
+    base_request = user_prompt or "professional design refinement and enhancement"
+    prefix = f"{original_prompt}, {base_request}, "
+    return tuple(prefix + suffix for suffix in _VARIATION_SUFFIXES)
+
+
+class CachedPromptService:
+    """
+    Caches logo variation prompts so near-duplicate refinement requests for the
+    same logo ("make it modern" vs "more modern please") skip Gemini analysis.
+    """
+    
+    def __init__(self, prompt_service, similarity_threshold: float = 0.92, ttl: int = 86400):
+        self.prompt_service = prompt_service
+        self.similarity_threshold = similarity_threshold
+        # sha256(logo_url) -> [(request terms, prompts), ...]
+        self._entries: TTLCache = TTLCache(maxsize=4096, ttl=ttl)
+        # Exact (logo_url, user_prompt) matches, e.g. repeated "regenerate" clicks
+        self._analysis_cache: TTLCache = TTLCache(maxsize=10000, ttl=3600)
+        # Per-key locks so concurrent identical requests share one Gemini call
+        self._analysis_locks: "weakref.WeakValueDictionary[bytes, asyncio.Lock]" = weakref.WeakValueDictionary()
+    
+    @staticmethod
+    def _request_terms(user_prompt: Optional[str]) -> FrozenSet[str]:
+        """Normalizes a refinement request to its set of meaningful words."""
+        words = _WORD_RE.findall((user_prompt or "").lower())
+        return frozenset(w for w in words if w not in _PROMPT_STOPWORDS)
+    
+    @staticmethod
+    def _similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+        """Jaccard similarity of two request term sets; empty requests match each other."""
+        if not a and not b:
+            return 1.0
+        return len(a & b) / len(a | b)
+    
+    async def analyze_logo_for_variations(self, logo_url: str, user_prompt: Optional[str] = None) -> List[str]:
+        """
+        Returns cached variation prompts for a similar request on the same logo,
+        otherwise delegates to the prompt service and caches the result.
+        
+        Args:
+            logo_url: URL of the logo image to analyze
+            user_prompt: Optional user refinement request
+            
+        Returns:
+            List of variation prompts
+        """
+        exact_key = hashlib.blake2b(f"{logo_url}|{user_prompt or ''}".encode(), digest_size=16).digest()
+        cached = self._analysis_cache.get(exact_key)
+        if cached is not None:
+            return list(cached)
+        
+        lock = self._analysis_locks.get(exact_key)
+        if lock is None:
+            lock = self._analysis_locks[exact_key] = asyncio.Lock()
+        
+        async with lock:
+            # An identical request may have finished while we waited
+            cached = self._analysis_cache.get(exact_key)
+            if cached is not None:
+                return list(cached)
+            
+            logo_key = hashlib.sha256(logo_url.encode()).hexdigest()
+            terms = self._request_terms(user_prompt)
+            
+            entries: List[Tuple[FrozenSet[str], Tuple[str, ...]]] = self._entries.get(logo_key, [])
+            if entries:
+                best_terms, best_prompts = max(entries, key=lambda entry: self._similarity(terms, entry[0]))
+                if self._similarity(terms, best_terms) >= self.similarity_threshold:
+                    logger.info("♻️ Reusing cached variation prompts for a similar refinement request")
+                    return list(best_prompts)
+            
+            variation_prompts = await self.prompt_service.analyze_logo_for_variations(
+                logo_url=logo_url,
+                user_prompt=user_prompt
+            )
+            if len(variation_prompts) >= 5:
+                self._analysis_cache[exact_key] = tuple(variation_prompts)
+                # Re-assign so the TTL restarts for logos that are actively refined
+                self._entries[logo_key] = entries + [(terms, tuple(variation_prompts))]
+            return variation_prompts
+
+
 class SimpleRefinementService:
     """
     Simplified refinement service for focused user flow.
@@ -21,8 +135,10 @@ class SimpleRefinementService:
     
     def __init__(self):
         self.image_service = ImageGenerationService()
-        self.prompt_service = PromptEngineeringService()
-        self.credit_cost = 5  # 5 credits for 5 variations
+        self.prompt_service = CachedPromptService(prompt_engineering_service)
+        self.credit_cost = 5  # 5 credits for 5 variations (charged by start_simple_refinement)
+        # Caps in-flight image-to-image jobs across all refinements
+        self._generation_semaphore = asyncio.Semaphore(settings.max_concurrent_generations)
     
     async def refine_logo(
         self,
@@ -48,134 +164,172 @@ class SimpleRefinementService:
         try:
             logger.info(f"Starting simple refinement for asset {asset_id} by user {user_id}")
             
-            # 1. Check user has sufficient credits
-            if not await credit_service.check_credits(user_id, self.credit_cost):
+            # 1-2. Load the original asset and pre-check credits concurrently; the
+            # check only avoids wasted Gemini work, the RPC below is authoritative
+            original_asset, has_credits = await asyncio.gather(
+                self._get_asset(asset_id),
+                credit_service.check_credits(user_id, self.credit_cost)
+            )
+            if not has_credits:
                 raise ValueError("Insufficient credits for refinement")
-            
-            # 2. Get original asset from database
-            original_asset = await self._get_asset(asset_id)
             if not original_asset:
                 raise ValueError(f"Asset {asset_id} not found")
             
-            # 3. Deduct credits upfront
-            success = await credit_service.deduct_credits(
-                user_id=user_id,
-                amount=self.credit_cost,
-                reason=f"Simple refinement of asset {asset_id}",
-                asset_id=asset_id
+            # 3. Generate 5 intelligent variation prompts using image analysis
+            variation_prompts = await self._generate_variation_prompts(
+                original_asset=original_asset,
+                user_prompt=user_prompt  # Can be None - we'll always generate 5 variations
             )
-            if not success:
-                raise ValueError("Credit deduction failed")
             
-            try:
-                # 4. Generate 5 intelligent variation prompts using image analysis
-                variation_prompts = await self._generate_variation_prompts(
-                    original_asset=original_asset,
-                    user_prompt=user_prompt  # Can be None - we'll always generate 5 variations
-                )
-                
-                # 5. Create database entries for 5 variations using secure RPC
-                variations_data = []
-                for i, prompt in enumerate(variation_prompts):
-                    variations_data.append({
-                        'prompt': prompt,
-                        'metadata': {
-                            'user_prompt': user_prompt,
-                            'variation_index': i + 1,
-                            'refinement_method': 'simple'
-                        }
-                    })
-                
-                # Use secure RPC function that enforces ownership
-                result = supabase_service.client.rpc(
-                    'create_refinement_assets_batch',
-                    {
-                        'p_user_id': user_id,
-                        'p_original_asset_id': asset_id,
-                        'p_variations': variations_data
+            # 4. Deduct credits and create the 5 variation entries in one transaction
+            variations_data = [
+                {
+                    'prompt': prompt,
+                    'metadata': {
+                        'user_prompt': user_prompt,
+                        'variation_index': i,
+                        'refinement_method': 'simple'
                     }
-                ).execute()
-                
-                if not result.data:
-                    raise Exception("Failed to create refinement assets")
-                
-                variation_asset_ids = [item['asset_id'] for item in result.data]
-                
-                # 6. Start background generation for all variations
-                generation_tasks = []
-                for i, (asset_id_new, prompt) in enumerate(zip(variation_asset_ids, variation_prompts)):
-                    task = asyncio.create_task(
-                        self._generate_single_variation(
-                            original_asset_url=original_asset['asset_url'],
-                            new_asset_id=asset_id_new,
-                            prompt=prompt,
-                            variation_index=i + 1
-                        )
-                    )
-                    generation_tasks.append(task)
-                
-                # Start all generations in parallel with proper error handling
-                async def monitor_generations():
-                    """Monitor background generation tasks and handle errors."""
-                    try:
-                        results = await asyncio.gather(*generation_tasks, return_exceptions=True)
-                        for i, result in enumerate(results):
-                            if isinstance(result, Exception):
-                                asset_id_failed = variation_asset_ids[i]
-                                logger.error(f"Background generation for asset {asset_id_failed} failed: {result}")
-                                
-                                # Update asset status to failed
-                                try:
-                                    supabase_service.client.table('generated_assets')\
-                                        .update({
-                                            'status': 'failed',
-                                            'error_message': str(result),
-                                            'updated_at': 'NOW()'
-                                        })\
-                                        .eq('id', asset_id_failed)\
-                                        .execute()
-                                except Exception as update_error:
-                                    logger.error(f"Failed to update asset {asset_id_failed} status: {update_error}")
-                            else:
-                                logger.info(f"Successfully completed background generation for variation {i+1}")
-                    except Exception as monitor_error:
-                        logger.error(f"Error in generation monitoring: {monitor_error}")
-                
-                # Schedule the monitoring task
-                asyncio.create_task(monitor_generations())
-                
-                logger.info(f"Successfully started refinement generation for {len(variation_asset_ids)} variations")
-                
-                return {
-                    'original_asset_id': asset_id,
-                    'variation_asset_ids': variation_asset_ids,
-                    'credits_used': self.credit_cost,
-                    'status': 'generating',
-                    'message': f'Generating {len(variation_asset_ids)} variations of your logo'
                 }
-                
-            except Exception as e:
-                # Refund credits if generation setup fails
-                await credit_service.refund_credits(
-                    user_id=user_id,
-                    amount=self.credit_cost,
-                    reason=f"Simple refinement failed: {str(e)}",
-                    asset_id=asset_id
+                for i, prompt in enumerate(variation_prompts, start=1)
+            ]
+            
+            try:
+                result = await asyncio.to_thread(
+                    get_supabase_service().client.rpc(
+                        'start_simple_refinement',
+                        {
+                            'p_user_id': user_id,
+                            'p_asset_id': asset_id,
+                            'p_variations': variations_data
+                        }
+                    ).execute
                 )
+            except APIError as e:
+                if 'insufficient_credits' in str(e.message):
+                    raise ValueError("Insufficient credits for refinement")
                 raise
+            
+            if not result.data:
+                raise Exception("Failed to create refinement assets")
+            
+            variation_asset_ids = [item['asset_id'] for item in result.data]
+            
+            # 5. Start background generation for all variations
+            generation_tasks = {
+                asyncio.create_task(
+                    self._generate_single_variation(
+                        original_asset_url=original_asset['asset_url'],
+                        new_asset_id=asset_id_new,
+                        prompt=prompt,
+                        variation_index=i
+                    )
+                ): (i, asset_id_new)
+                for i, (asset_id_new, prompt) in enumerate(zip(variation_asset_ids, variation_prompts), start=1)
+            }
+            
+            # Start all generations in parallel with proper error handling
+            async def monitor_generations(pending_tasks: Dict[asyncio.Task, Tuple[int, str]]):
+                """Monitor background generation tasks and handle errors."""
+                try:
+                    # Handle each variation as it lands; finished tasks are dropped
+                    # right away so failed ones don't keep their tracebacks alive
+                    # until the slowest generation is done
+                    failed_items = []
+                    fatal = False
+                    while pending_tasks and not fatal:
+                        done, _ = await asyncio.wait(pending_tasks, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            variation_index, asset_id_done = pending_tasks.pop(task)
+                            error = task.exception()
+                            if error is None:
+                                logger.info(f"Successfully completed background generation for variation {variation_index}")
+                                continue
+                            logger.error(f"Background generation for asset {asset_id_done} failed: {error}")
+                            failed_items.append({'id': asset_id_done, 'error': str(error)})
+                            fatal = fatal or isinstance(error, FatalGenerationError)
+                            del error
+                    
+                    # The provider rejected a variation outright - the siblings would
+                    # only burn their full timeout before failing the same way
+                    if pending_tasks:
+                        logger.error(f"Image provider rejected refinement of {asset_id}, cancelling {len(pending_tasks)} remaining variations")
+                        for task in pending_tasks:
+                            task.cancel()
+                        await asyncio.gather(*pending_tasks, return_exceptions=True)
+                        await self._mark_variations_failed(
+                            [asset_id_left for _, asset_id_left in pending_tasks.values()],
+                            "Cancelled: image provider rejected the refinement"
+                        )
+                    
+                    # Update all failed assets in one round trip
+                    if failed_items:
+                        try:
+                            await asyncio.to_thread(
+                                get_supabase_service().client.rpc(
+                                    'mark_assets_failed_batch',
+                                    {'p_items': failed_items}
+                                ).execute
+                            )
+                        except Exception as update_error:
+                            logger.error(f"Failed to update status of {len(failed_items)} failed assets: {update_error}")
+                except Exception as monitor_error:
+                    logger.error(f"Error in generation monitoring: {monitor_error}")
+            
+            # Schedule the monitoring task
+            monitor = asyncio.create_task(monitor_generations(generation_tasks))
+            _background_tasks.add(monitor)
+            monitor.add_done_callback(_background_tasks.discard)
+            
+            logger.info(f"Successfully started refinement generation for {len(variation_asset_ids)} variations")
+            
+            return {
+                'original_asset_id': asset_id,
+                'variation_asset_ids': variation_asset_ids,
+                'credits_used': self.credit_cost,
+                'status': 'generating',
+                'message': f'Generating {len(variation_asset_ids)} variations of your logo'
+            }
                 
         except Exception as e:
             logger.error(f"Simple refinement failed for asset {asset_id}: {str(e)}")
             raise
     
+    async def _mark_variations_failed(self, asset_ids: List[str], error_message: str) -> None:
+        """
+        Mark unfinished variations as failed in a single update.
+        
+        Args:
+            asset_ids: Variation asset IDs to mark
+            error_message: Error stored on each asset
+        """
+        if not asset_ids:
+            return
+        try:
+            await asyncio.to_thread(
+                get_supabase_service().client.table('generated_assets')
+                .update({
+                    'status': 'failed',
+                    'error_message': error_message,
+                    'updated_at': 'NOW()'
+                })
+                .in_('id', asset_ids)
+                .in_('status', ['pending', 'generating'])
+                .execute
+            )
+        except Exception as e:
+            logger.error(f"Failed to mark variations {asset_ids} as failed: {e}")
+    
     async def _get_asset(self, asset_id: str) -> Optional[Dict]:
         """Get asset data from database"""
         try:
-            result = supabase_service.client.table('generated_assets')\
-                .select('*')\
-                .eq('id', asset_id)\
-                .single()\
-                .execute()
+            result = await asyncio.to_thread(
+                get_supabase_service().client.table('generated_assets')
+                .select('*')
+                .eq('id', asset_id)
+                .single()
+                .execute
+            )
             return result.data
         except Exception as e:
             logger.error(f"Failed to get asset {asset_id}: {e}")
@@ -203,6 +357,14 @@ class SimpleRefinementService:
                 logger.warning("No logo URL available, using prompt-based fallback")
                 return self._get_prompt_based_variations(original_asset['generation_prompt'], user_prompt)
             
+            # Neutral variations are precomputed when the logo is generated. The
+            # batch prefetch stores one project-wide result, which assumes the
+            # analysis ignores the image; revisit both when it stops doing so
+            cached_prompts = original_asset.get('cached_variation_prompts')
+            if user_prompt is None and cached_prompts and len(cached_prompts) >= 5:
+                logger.info("♻️ Using variation prompts precomputed at generation time")
+                return cached_prompts[:5]
+            
             # Use Gemini to analyze the actual logo image and generate intelligent variations
             logger.info(f"🎨 Analyzing logo image for intelligent variations: {user_prompt or 'automatic refinement'}")
             
@@ -233,19 +395,8 @@ class SimpleRefinementService:
         Returns:
             List of 5 design-principle-based variation prompts
         """
-        base_request = user_prompt or "professional design refinement and enhancement"
-        
-        # Design-principle-based variations that work with any logo prompt
-        variations = [
-            f"{original_prompt}, {base_request}, minimalist approach with clean lines and increased white space",
-            f"{original_prompt}, {base_request}, bold contemporary style with stronger visual impact", 
-            f"{original_prompt}, {base_request}, organic flowing interpretation with softer edges and curves",
-            f"{original_prompt}, {base_request}, technical precision enhancement with mathematical proportions",
-            f"{original_prompt}, {base_request}, dynamic modern evolution with implied movement and energy"
-        ]
-        
         logger.info("Using design-principle-based prompt variations")
-        return variations
+        return list(_prompt_based_variations(original_prompt, user_prompt))
     
     async def _generate_single_variation(
         self,
@@ -271,11 +422,12 @@ class SimpleRefinementService:
             
             # Generate new logo using image-to-image editing
             # The generate_variation method handles all database updates internally
-            result = await self.image_service.generate_variation(
-                original_image_url=original_asset_url,
-                modification_prompt=prompt,
-                asset_id=new_asset_id
-            )
+            async with self._generation_semaphore:
+                result = await self.image_service.generate_variation(
+                    original_image_url=original_asset_url,
+                    modification_prompt=prompt,
+                    asset_id=new_asset_id
+                )
             
             if result:
                 logger.info(f"Successfully generated variation {variation_index}")
@@ -284,6 +436,9 @@ class SimpleRefinementService:
                 logger.error(f"Failed to generate variation {variation_index}")
                 return False
                 
+        except FatalGenerationError:
+            # Let the monitor cancel the sibling variations
+            raise
         except Exception as e:
             logger.error(f"Failed to generate variation {variation_index}: {e}")
             return False
@@ -299,15 +454,18 @@ class SimpleRefinementService:
             Dict with progress information
         """
         try:
-            # Get all variation assets for this refinement
-            result = supabase_service.client.table('generated_assets')\
-                .select('id, status, asset_url, created_at')\
-                .eq('parent_asset_id', original_asset_id)\
-                .eq('asset_type', 'simple_refinement')\
-                .execute()
+            # Status counts and completed variations are aggregated in Postgres
+            result = await asyncio.to_thread(
+                get_supabase_service().client.rpc(
+                    'get_refinement_progress',
+                    {'p_asset_id': original_asset_id}
+                ).execute
+            )
             
-            variations = result.data or []
-            total_variations = len(variations)
+            progress = result.data or {}
+            counts = progress.get('counts') or {}
+            completed = progress.get('completed') or []
+            total_variations = sum(counts.values())
             
             if total_variations == 0:
                 return {
@@ -315,14 +473,9 @@ class SimpleRefinementService:
                     'message': 'No refinement found for this asset'
                 }
             
-            # Count completed variations
-            completed = [v for v in variations if v['status'] == 'completed']
-            failed = [v for v in variations if v['status'] == 'failed']
-            generating = [v for v in variations if v['status'] == 'generating']
-            
-            completed_count = len(completed)
-            failed_count = len(failed)
-            generating_count = len(generating)
+            completed_count = counts.get('completed', 0)
+            failed_count = counts.get('failed', 0)
+            generating_count = counts.get('generating', 0)
             
             if completed_count == total_variations:
                 status = 'completed'
@@ -347,14 +500,7 @@ class SimpleRefinementService:
                     'generating': generating_count,
                     'percentage': (completed_count / total_variations) * 100 if total_variations > 0 else 0
                 },
-                'completed_variations': [
-                    {
-                        'id': v['id'],
-                        'asset_url': v['asset_url'],
-                        'created_at': v['created_at']
-                    }
-                    for v in completed
-                ]
+                'completed_variations': completed
             }
             
         except Exception as e:
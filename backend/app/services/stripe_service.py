@@ -3,24 +3,68 @@ Stripe Payment Service for LogoKraft
 Handles payment intents, webhooks, and refunds for $29 brand kit purchases
 """
 
+import asyncio
 import stripe
 import logging
+import requests
+import weakref
+from requests.adapters import HTTPAdapter
 from typing import Dict, Optional, Any
 from datetime import datetime
-import json
+import orjson
+from cachetools import TTLCache
 
 from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Inline-priced brand kit line item, used when no Stripe price ID is configured
+_BRAND_KIT_LINE_ITEMS = [{
+    "price_data": {
+        "currency": "usd",
+        "product_data": {
+            "name": "LogoKraft Brand Kit",
+            "description": "Complete brand identity package with 5 professional assets",
+            "images": ["https://logokraft.com/brand-kit-preview.png"]  # Add actual preview image
+        },
+        "unit_amount": 2900,  # $29.00
+    },
+    "quantity": 1,
+}]
+
+
+def _build_stripe_http_client() -> stripe.RequestsClient:
+    """Stripe HTTP client backed by a pooled keep-alive session."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50)
+    session.mount("https://", adapter)
+    return stripe.RequestsClient(session=session)
+
 
 class StripeService:
     """Service for handling Stripe payment operations"""
     
+    # Static request fragments; only user_id / asset_id vary per purchase
+    _PAYMENT_INTENT_METADATA = {"product": "brand_kit", "price": "29.00"}
+    _CHECKOUT_METADATA = {"product": "brand_kit"}
+    _AUTOMATIC_PAYMENT_METHODS = {
+        "enabled": True,
+        "allow_redirects": "never"  # For embedded checkout
+    }
+    
+    # How long an email -> Stripe customer ID lookup stays valid
+    CUSTOMER_CACHE_TTL = 3600
+    
     def __init__(self):
         """Initialize Stripe with API key"""
+        # email -> customer_id, bounded so the set of seen emails can't grow forever
+        self._customer_cache: TTLCache = TTLCache(maxsize=10000, ttl=self.CUSTOMER_CACHE_TTL)
+        # Per-email locks so concurrent lookups for one user hit Stripe once
+        self._customer_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
         if settings.stripe_secret_key:
             stripe.api_key = settings.stripe_secret_key
+            # Reuse TLS connections to api.stripe.com across calls
+            stripe.default_http_client = _build_stripe_http_client()
             logger.info("✅ Stripe service initialized")
         else:
             logger.warning("⚠️ Stripe secret key not configured")
@@ -46,21 +90,18 @@ class StripeService:
         """
         try:
             # Create payment intent with metadata
-            payment_intent = stripe.PaymentIntent.create(
+            payment_intent = await asyncio.to_thread(
+                stripe.PaymentIntent.create,
                 amount=amount,
                 currency="usd",
                 metadata={
+                    **self._PAYMENT_INTENT_METADATA,
                     "user_id": user_id,
-                    "asset_id": selected_asset_id,
-                    "product": "brand_kit",
-                    "price": "29.00"
+                    "asset_id": selected_asset_id
                 },
                 receipt_email=user_email,
                 description="LogoKraft Brand Kit - Professional brand assets package",
-                automatic_payment_methods={
-                    "enabled": True,
-                    "allow_redirects": "never"  # For embedded checkout
-                }
+                automatic_payment_methods=self._AUTOMATIC_PAYMENT_METHODS
             )
             
             logger.info(f"Created payment intent {payment_intent.id} for user {user_id}")
@@ -102,29 +143,18 @@ class StripeService:
             Dict containing checkout session details
         """
         try:
-            # Create line item for brand kit
-            line_items = [{
-                "price_data": {
-                    "currency": "usd",
-                    "product_data": {
-                        "name": "LogoKraft Brand Kit",
-                        "description": "Complete brand identity package with 5 professional assets",
-                        "images": ["https://logokraft.com/brand-kit-preview.png"]  # Add actual preview image
-                    },
-                    "unit_amount": 2900,  # $29.00
-                },
-                "quantity": 1,
-            }]
-            
             # Use configured price_id if available (for production)
             if settings.stripe_price_id:
                 line_items = [{
                     "price": settings.stripe_price_id,
                     "quantity": 1,
                 }]
+            else:
+                line_items = _BRAND_KIT_LINE_ITEMS
             
             # Create checkout session
-            session = stripe.checkout.Session.create(
+            session = await asyncio.to_thread(
+                stripe.checkout.Session.create,
                 payment_method_types=["card"],
                 line_items=line_items,
                 mode="payment",
@@ -132,9 +162,9 @@ class StripeService:
                 cancel_url=cancel_url,
                 customer_email=user_email,
                 metadata={
+                    **self._CHECKOUT_METADATA,
                     "user_id": user_id,
-                    "asset_id": selected_asset_id,
-                    "product": "brand_kit"
+                    "asset_id": selected_asset_id
                 },
                 payment_intent_data={
                     "description": "LogoKraft Brand Kit Purchase",
@@ -178,10 +208,11 @@ class StripeService:
         try:
             if not settings.stripe_webhook_secret:
                 logger.warning("Webhook secret not configured, skipping verification")
-                return json.loads(payload)
+                return orjson.loads(payload)
             
             # Verify webhook signature
-            event = stripe.Webhook.construct_event(
+            event = await asyncio.to_thread(
+                stripe.Webhook.construct_event,
                 payload,
                 signature,
                 settings.stripe_webhook_secret
@@ -211,7 +242,7 @@ class StripeService:
             Payment intent details
         """
         try:
-            payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            payment_intent = await asyncio.to_thread(stripe.PaymentIntent.retrieve, payment_intent_id)
             
             return {
                 "id": payment_intent.id,
@@ -254,7 +285,7 @@ class StripeService:
             if amount:
                 refund_data["amount"] = amount
             
-            refund = stripe.Refund.create(**refund_data)
+            refund = await asyncio.to_thread(stripe.Refund.create, **refund_data)
             
             logger.info(f"Created refund {refund.id} for payment {payment_intent_id}")
             
@@ -287,16 +318,13 @@ class StripeService:
             List of payment records
         """
         try:
-            # Search for customer by email
-            customers = stripe.Customer.list(email=user_email, limit=1)
-            
-            if not customers.data:
+            customer_id = await self._get_customer_id(user_email)
+            if not customer_id:
                 return []
             
-            customer_id = customers.data[0].id
-            
             # Get payment intents for customer
-            payment_intents = stripe.PaymentIntent.list(
+            payment_intents = await asyncio.to_thread(
+                stripe.PaymentIntent.list,
                 customer=customer_id,
                 limit=limit
             )
@@ -317,6 +345,38 @@ class StripeService:
             logger.error(f"Error listing customer payments: {e}")
             return []
     
+    async def _get_customer_id(self, user_email: str) -> Optional[str]:
+        """
+        Look up the Stripe customer ID for an email, cached for an hour.
+        
+        Args:
+            user_email: Customer email
+            
+        Returns:
+            Customer ID, or None if Stripe has no customer with that email
+        """
+        cached = self._customer_cache.get(user_email)
+        if cached:
+            return cached
+        
+        lock = self._customer_locks.get(user_email)
+        if lock is None:
+            lock = self._customer_locks[user_email] = asyncio.Lock()
+        
+        async with lock:
+            # Another request may have filled the cache while we waited
+            cached = self._customer_cache.get(user_email)
+            if cached:
+                return cached
+            
+            customers = await asyncio.to_thread(stripe.Customer.list, email=user_email, limit=1)
+            if not customers.data:
+                return None
+            
+            customer_id = customers.data[0].id
+            self._customer_cache[user_email] = customer_id
+            return customer_id
+    
     def is_configured(self) -> bool:
         """Check if Stripe is properly configured."""
         return bool(settings.stripe_secret_key)
@@ -1,13 +1,150 @@
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+from typing import Optional, Dict, Any, List, Union, Tuple, BinaryIO, AsyncIterator, Mapping
+import base64
+import functools
+import hashlib
+import hmac
 import logging
+import posixpath
 import asyncio
-from supabase import create_client, Client
+import re
+import time
+import httpx
+import jwt
+import orjson
+from cachetools import TLRUCache, TTLCache
+from postgrest import SyncPostgrestClient
+from supabase import Client
 from supabase.lib.client_options import ClientOptions
 from app.config.settings import settings
+from app.services.http_client import get_http_client
+from app.services.pg_pool import get_pg_pool, record_to_dict
 
 logger = logging.getLogger(__name__)
 
+# Bounded keep-alive pool for PostgREST; the client lives as long as the process
+_POSTGREST_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0)
+
+# Column lists for project/asset reads; brief_data is only loaded when needed.
+# Joined once at import in PostgREST's wire form (no whitespace), so each
+# query only copies a ready-made select= value.
+_PROJECT_SUMMARY_COLUMNS = ",".join((
+    "id", "user_id", "project_name", "inspiration_image_url", "created_at", "updated_at"
+))
+_PROJECT_FULL_COLUMNS = ",".join((
+    "id", "user_id", "project_name", "brief_data", "inspiration_image_url", "created_at", "updated_at"
+))
+_ASSET_COLUMNS = ",".join((
+    "id", "project_id", "asset_type", "status", "asset_url", "generation_prompt",
+    "parent_asset_id", "created_at", "updated_at"
+))
+
+# Direct-Postgres forms of the hot reads, used when a pool is configured
+_PROJECT_SUMMARY_SQL = f"SELECT {_PROJECT_SUMMARY_COLUMNS} FROM brand_projects WHERE id = $1 AND user_id = $2"
+_PROJECT_FULL_SQL = f"SELECT {_PROJECT_FULL_COLUMNS} FROM brand_projects WHERE id = $1 AND user_id = $2"
+_PROJECT_ASSETS_SQL = (
+    f"SELECT {_ASSET_COLUMNS} FROM generated_assets WHERE project_id = $1 "
+    "ORDER BY created_at LIMIT $2 OFFSET $3"
+)
+
+# Characters kept from client filenames when building storage keys
+_UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9._-]")
+
+# Read size when streaming uploads to Storage
+_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+async def _iter_file_chunks(file: BinaryIO) -> AsyncIterator[bytes]:
+    """Yields a file object's content in fixed-size chunks for streaming uploads."""
+    # Spooled uploads may be on disk, so reads run off the event loop
+    while chunk := await asyncio.to_thread(file.read, _UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
+# Inspiration images are shared through signed URLs valid for a week; cached
+# URLs are dropped an hour early so callers never get one about to expire
+_SIGNED_URL_EXPIRY = 7 * 24 * 60 * 60
+_signed_url_cache: TTLCache = TTLCache(maxsize=4096, ttl=_SIGNED_URL_EXPIRY - 3600)
+
+# Validated tokens are trusted for this long before Supabase Auth is asked
+# again. Sign-outs and deletions are pushed through the auth webhook and
+# evict entries immediately; the TTL only bounds how long a revocation can
+# go unnoticed if a webhook delivery is lost.
+_USER_CACHE_TTL = 300
+
+# Standard Webhooks signatures older than this are rejected as replays
+_AUTH_WEBHOOK_TOLERANCE = 5 * 60
+
+
+def _user_cache_ttu(_key: str, value: Tuple[Dict[str, Any], float], now: float) -> float:
+    """Cache entries expire after _USER_CACHE_TTL or when the token does, whichever is first."""
+    return min(now + _USER_CACHE_TTL, value[1])
+
+
+# sha256(token)[:32] -> (user, token expiry timestamp)
+_user_cache: TLRUCache = TLRUCache(maxsize=10000, ttu=_user_cache_ttu, timer=time.time)
+
+# user id -> cache keys of that user's tokens, so auth events can evict them
+_user_cache_keys: TTLCache = TTLCache(maxsize=10000, ttl=_USER_CACHE_TTL)
+
+# user id -> time of their last auth event. Locally verified tokens issued
+# before it are re-checked with Supabase Auth; kept for the lifetime of an
+# access token (Supabase's default JWT expiry), after which they have expired
+_REVOKED_USER_TTL = 3600
+_revoked_users: TTLCache = TTLCache(maxsize=10000, ttl=_REVOKED_USER_TTL)
+
+
+class OrjsonHttpClient(httpx.Client):
+    """
+    httpx client that encodes and decodes JSON bodies with orjson.
+    PostgREST payloads (asset batches, brief_data) skip the stdlib json module.
+    """
+    
+    def build_request(self, method: str, url: Union[httpx.URL, str], *, json: Any = None, **kwargs) -> httpx.Request:
+        if json is not None and kwargs.get("content") is None:
+            kwargs["content"] = orjson.dumps(json)
+            kwargs["headers"] = httpx.Headers(kwargs.get("headers"))
+            kwargs["headers"].setdefault("Content-Type", "application/json")
+        return super().build_request(method, url, **kwargs)
+    
+    def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        response = super().send(request, **kwargs)
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so postgrest's
+        # fallback for non-JSON bodies keeps working
+        response.json = lambda **_: orjson.loads(response.content)
+        return response
+
+
+class SupabaseClient(Client):
+    """
+    Supabase client whose PostgREST session uses OrjsonHttpClient.
+    Overriding the factory keeps orjson in place when supabase-py rebuilds
+    the PostgREST client after auth state changes.
+    """
+    
+    @staticmethod
+    def _init_postgrest_client(
+        rest_url: str,
+        headers: Dict[str, str],
+        schema: str,
+        timeout: Union[int, float, httpx.Timeout] = 120,
+        verify: bool = True,
+        proxy: Optional[str] = None,
+        http_client: Optional[httpx.Client] = None,
+    ) -> SyncPostgrestClient:
+        return SyncPostgrestClient(
+            rest_url,
+            headers=headers,
+            schema=schema,
+            http_client=http_client or OrjsonHttpClient(
+                timeout=timeout,
+                verify=verify,
+                proxy=proxy,
+                follow_redirects=True,
+                http2=True,
+                limits=_POSTGREST_LIMITS
+            )
+        )
+
 class SupabaseService:
     """
     Service for interacting with Supabase database and authentication.
@@ -17,7 +154,7 @@ class SupabaseService:
     def __init__(self):
         """Initialize Supabase client with service role key for backend operations."""
         try:
-            self.client: Client = create_client(
+            self.client: Client = SupabaseClient.create(
                 settings.supabase_url,
                 settings.supabase_service_key,
                 options=ClientOptions(
@@ -112,21 +249,122 @@ class SupabaseService:
         Returns:
             User data if token is valid, None otherwise
         """
+        # Anything that isn't header.payload.signature can't be a valid JWT
+        if token.count(".") != 2:
+            return None
+        
+        # Supabase signs access tokens with the project JWT secret, so they can
+        # be verified locally without a round trip to Supabase Auth
+        if settings.supabase_jwt_secret:
+            try:
+                payload = jwt.decode(
+                    token,
+                    settings.supabase_jwt_secret,
+                    algorithms=["HS256"],
+                    audience="authenticated"
+                )
+                revoked_at = _revoked_users.get(payload["sub"])
+                if revoked_at is None or payload.get("iat", 0) > revoked_at:
+                    return {
+                        "id": payload["sub"],
+                        "email": payload.get("email")
+                    }
+                # The session may have been signed out since this token was issued
+                logger.debug(f"Token predates an auth event for {payload['sub']}, asking Supabase Auth")
+            except jwt.InvalidTokenError as e:
+                logger.debug(f"Local token verification failed, asking Supabase Auth: {e}")
+        
+        cache_key = hashlib.sha256(token.encode()).hexdigest()[:32]
+        cached = _user_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached[0])
+        
         try:
             response = await asyncio.to_thread(
                 self.client.auth.get_user, 
                 token
             )
             if response.user:
-                return {
+                user = {
                     "id": response.user.id,
                     "email": response.user.email
                 }
+                # Supabase already verified the token; only its expiry is needed here
+                expires_at = jwt.decode(token, options={"verify_signature": False}).get("exp", 0)
+                _user_cache[cache_key] = (user, float(expires_at))
+                keys = _user_cache_keys.get(user["id"]) or set()
+                keys.add(cache_key)
+                _user_cache_keys[user["id"]] = keys
+                return dict(user)
             return None
         except Exception as e:
             logger.error(f"Token validation failed: {e}")
             return None
     
+    def invalidate_user(self, user_id: str) -> int:
+        """
+        Drop every cached token validation for a user.
+        
+        Tokens issued before this call also stop being trusted on the local
+        JWT verification path and are re-validated against Supabase Auth.
+        
+        Args:
+            user_id: ID of the user whose sessions changed
+            
+        Returns:
+            Number of cache entries evicted
+        """
+        _revoked_users[user_id] = time.time()
+        evicted = 0
+        for cache_key in _user_cache_keys.pop(user_id, ()):
+            if _user_cache.pop(cache_key, None) is not None:
+                evicted += 1
+        return evicted
+    
+    def verify_auth_webhook(self, payload: bytes, headers: Mapping[str, str]) -> Dict[str, Any]:
+        """
+        Verify a Supabase auth webhook (Standard Webhooks signature) and parse it.
+        
+        Args:
+            payload: Raw request body
+            headers: Request headers carrying webhook-id, webhook-timestamp
+                and webhook-signature
+            
+        Returns:
+            Parsed webhook event
+            
+        Raises:
+            ValueError: If the signature is missing, stale or invalid
+        """
+        if not settings.supabase_auth_webhook_secret:
+            logger.warning("Auth webhook secret not configured, skipping verification")
+            return orjson.loads(payload)
+        
+        webhook_id = headers.get("webhook-id")
+        timestamp = headers.get("webhook-timestamp")
+        signatures = headers.get("webhook-signature")
+        if not (webhook_id and timestamp and signatures):
+            raise ValueError("Missing webhook signature headers")
+        try:
+            sent_at = int(timestamp)
+        except ValueError:
+            raise ValueError("Invalid webhook timestamp")
+        if abs(time.time() - sent_at) > _AUTH_WEBHOOK_TOLERANCE:
+            raise ValueError("Webhook timestamp outside tolerance")
+        
+        secret = settings.supabase_auth_webhook_secret.removeprefix("v1,").removeprefix("whsec_")
+        signed = f"{webhook_id}.{timestamp}.".encode() + payload
+        expected = base64.b64encode(
+            hmac.new(base64.b64decode(secret), signed, hashlib.sha256).digest()
+        ).decode()
+        
+        # The header may carry several space-separated "v1,<sig>" entries
+        for candidate in signatures.split():
+            version, _, signature = candidate.partition(",")
+            if version == "v1" and hmac.compare_digest(signature, expected):
+                return orjson.loads(payload)
+        raise ValueError("Invalid webhook signature")
+    
     # Project CRUD Operations
     
     async def create_project(self, user_id: str, project_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -151,7 +389,9 @@ class SupabaseService:
                 "inspiration_image_url": project_data.get("inspiration_image_url")
             }
             
-            response = self.client.table("brand_projects").insert(project_record).execute()
+            response = await asyncio.to_thread(
+                self.client.table("brand_projects").insert(project_record).execute
+            )
             
             if not response.data:
                 raise Exception("Failed to create project")
@@ -159,14 +399,61 @@ class SupabaseService:
             created_project = response.data[0]
             logger.info(f"Project created: {created_project['id']} for user {user_id}")
             
-            return created_project
+            return await self._with_inspiration_url(created_project)
         except Exception as e:
             logger.error(f"Project creation failed: {e}")
             raise Exception(f"Failed to create project: {str(e)}")
     
+    def _project_query(self, columns: str, project_id: str, user_id: str):
+        """
+        Fixed-shape owner-scoped project lookup shared by the project reads.
+        
+        Args:
+            columns: Pre-joined select list
+            project_id: Project ID to retrieve
+            user_id: ID of the requesting user
+            
+        Returns:
+            Unexecuted PostgREST select builder
+        """
+        return (
+            self.client.table("brand_projects")
+            .select(columns)
+            .eq("id", project_id)
+            .eq("user_id", user_id)
+            .limit(1)
+        )
+    
     async def get_project(self, project_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """
-        Get project by ID, ensuring it belongs to the user.
+        Get project summary by ID, ensuring it belongs to the user.
+        Excludes brief_data; use get_project_full when the brief is needed.
+        
+        Args:
+            project_id: Project ID to retrieve
+            user_id: ID of the requesting user
+            
+        Returns:
+            Project data if found and authorized, None otherwise
+        """
+        try:
+            pool = await get_pg_pool()
+            if pool is not None:
+                row = await pool.fetchrow(_PROJECT_SUMMARY_SQL, project_id, user_id)
+                return await self._with_inspiration_url(record_to_dict(row)) if row else None
+            
+            response = await asyncio.to_thread(self._project_query(_PROJECT_SUMMARY_COLUMNS, project_id, user_id).execute)
+            
+            if response.data:
+                return await self._with_inspiration_url(response.data[0])
+            return None
+        except Exception as e:
+            logger.error(f"Failed to get project {project_id}: {e}")
+            return None
+    
+    async def get_project_full(self, project_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get project by ID including brief_data, ensuring it belongs to the user.
         
         Args:
             project_id: Project ID to retrieve
@@ -176,27 +463,46 @@ class SupabaseService:
             Project data if found and authorized, None otherwise
         """
         try:
-            response = self.client.table("brand_projects").select("*").eq("id", project_id).eq("user_id", user_id).execute()
+            pool = await get_pg_pool()
+            if pool is not None:
+                row = await pool.fetchrow(_PROJECT_FULL_SQL, project_id, user_id)
+                return await self._with_inspiration_url(record_to_dict(row)) if row else None
+            
+            response = await asyncio.to_thread(self._project_query(_PROJECT_FULL_COLUMNS, project_id, user_id).execute)
             
             if response.data:
-                return response.data[0]
+                return await self._with_inspiration_url(response.data[0])
             return None
         except Exception as e:
             logger.error(f"Failed to get project {project_id}: {e}")
             return None
     
-    async def get_project_assets(self, project_id: str) -> List[Dict[str, Any]]:
+    async def get_project_assets(self, project_id: str, limit: int = 200, offset: int = 0) -> List[Dict[str, Any]]:
         """
-        Get all generated assets for a project.
+        Get generated assets for a project, oldest first.
         
         Args:
             project_id: Project ID to get assets for
+            limit: Maximum number of assets to return
+            offset: Number of assets to skip
             
         Returns:
             List of asset records
         """
         try:
-            response = self.client.table("generated_assets").select("*").eq("project_id", project_id).execute()
+            pool = await get_pg_pool()
+            if pool is not None:
+                rows = await pool.fetch(_PROJECT_ASSETS_SQL, project_id, limit, offset)
+                return [record_to_dict(row) for row in rows]
+            
+            response = await asyncio.to_thread(
+                self.client.table("generated_assets")
+                .select(_ASSET_COLUMNS)
+                .eq("project_id", project_id)
+                .order("created_at")
+                .range(offset, offset + limit - 1)
+                .execute
+            )
             return response.data or []
         except Exception as e:
             logger.error(f"Failed to get assets for project {project_id}: {e}")
@@ -213,7 +519,9 @@ class SupabaseService:
             Asset record or None if not found
         """
         try:
-            response = self.client.table("generated_assets").select("*").eq("id", asset_id).single().execute()
+            response = await asyncio.to_thread(
+                self.client.table("generated_assets").select("*").eq("id", asset_id).single().execute
+            )
             return response.data
         except Exception as e:
             logger.error(f"Failed to get asset {asset_id}: {e}")
@@ -221,44 +529,107 @@ class SupabaseService:
     
     # File Upload Methods
     
-    async def upload_inspiration_image(self, file_content: bytes, filename: str, user_id: str) -> str:
+    async def upload_inspiration_image(
+        self,
+        file: BinaryIO,
+        filename: str,
+        user_id: str,
+        content_type: str = "image/jpeg"
+    ) -> str:
         """
-        Upload inspiration image to Supabase storage.
+        Upload inspiration image to Supabase storage, streaming it from the
+        file object instead of holding the whole image in memory.
         
         Args:
-            file_content: Binary file content
+            file: Readable binary file (e.g. UploadFile.file)
             filename: Original filename
             user_id: ID of the user uploading
+            content_type: MIME type of the image
             
         Returns:
-            Public URL of uploaded file
+            Object path within the inspiration-images bucket; it is stored on
+            the project and signed on read (see resolve_inspiration_url)
             
         Raises:
             Exception: If upload fails
         """
         try:
             # Create unique filename with user_id prefix
-            unique_filename = f"{user_id}/{datetime.utcnow().timestamp()}_{filename}"
+            # (client-supplied name reduced to a storage-safe basename)
+            safe_name = _UNSAFE_FILENAME_RE.sub("_", posixpath.basename(filename.replace("\\", "/"))) or "upload"
+            unique_filename = f"{user_id}/{time.time_ns()}_{safe_name}"
             
-            # Upload to inspiration-images bucket
-            response = self.client.storage.from_("inspiration-images").upload(
-                unique_filename,
-                file_content
+            # Stream to the inspiration-images bucket through the Storage REST API
+            file.seek(0, 2)
+            size = file.tell()
+            file.seek(0)
+            response = await get_http_client().post(
+                f"{settings.supabase_url}/storage/v1/object/inspiration-images/{unique_filename}",
+                content=_iter_file_chunks(file),
+                headers={
+                    "Authorization": f"Bearer {settings.supabase_service_key}",
+                    "apikey": settings.supabase_service_key,
+                    "Content-Type": content_type,
+                    "Content-Length": str(size),
+                    "x-upsert": "false"
+                }
             )
-            
-            if response.path is None:
-                raise Exception("Upload failed - no path returned")
-            
-            # Get public URL
-            public_url = self.client.storage.from_("inspiration-images").get_public_url(unique_filename)
+            response.raise_for_status()
             
             logger.info(f"Image uploaded: {unique_filename} for user {user_id}")
-            return public_url
+            return unique_filename
             
         except Exception as e:
             logger.error(f"Image upload failed: {e}")
             raise Exception(f"Failed to upload image: {str(e)}")
     
+    async def get_signed_url(self, bucket: str, path: str) -> str:
+        """
+        Get a signed URL for a stored object, reusing it while it is still valid.
+        
+        Args:
+            bucket: Storage bucket name
+            path: Object path within the bucket
+            
+        Returns:
+            Signed URL valid for up to a week
+        """
+        cache_key = f"{bucket}/{path}"
+        signed_url = _signed_url_cache.get(cache_key)
+        if signed_url is None:
+            response = await asyncio.to_thread(
+                self.client.storage.from_(bucket).create_signed_url,
+                path,
+                _SIGNED_URL_EXPIRY
+            )
+            signed_url = _signed_url_cache[cache_key] = response["signedURL"]
+        return signed_url
+    
+    async def resolve_inspiration_url(self, stored: Optional[str]) -> Optional[str]:
+        """
+        Turn a project's stored inspiration image reference into a usable URL.
+        
+        Args:
+            stored: Object path in the inspiration-images bucket, or a full URL
+                for projects created before paths were stored
+            
+        Returns:
+            Signed (cached) URL for paths, the value itself for URLs, or None
+        """
+        if not stored or stored.startswith(("http://", "https://")):
+            return stored
+        return await self.get_signed_url("inspiration-images", stored)
+    
+    async def _with_inspiration_url(self, project: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace a project's stored inspiration path with a signed URL."""
+        if project.get("inspiration_image_url"):
+            try:
+                project["inspiration_image_url"] = await self.resolve_inspiration_url(project["inspiration_image_url"])
+            except Exception as e:
+                logger.warning(f"Could not sign inspiration image for project {project.get('id')}: {e}")
+                project["inspiration_image_url"] = None
+        return project
+    
     # Database Health Check
     
     async def health_check(self) -> bool:
@@ -269,11 +640,19 @@ class SupabaseService:
             True if connection is healthy, False otherwise
         """
         try:
-            response = self.client.table("brand_projects").select("id").limit(1).execute()
+            # ping() is a constant SELECT 1, independent of table sizes
+            await asyncio.to_thread(self.client.rpc("ping").execute)
             return True
         except Exception as e:
             logger.error(f"Database health check failed: {e}")
             return False
 
-# Global service instance
-supabase_service = SupabaseService()
\ No newline at end of file
+@functools.cache
+def get_supabase_service() -> SupabaseService:
+    """
+    Get the process-wide Supabase service, creating its client on first use.
+    
+    Returns:
+        Shared SupabaseService instance
+    """
+    return SupabaseService()
\ No newline at end of file
@@ -3,11 +3,13 @@ User Service for LogoKraft
 Handles user management and OAuth provider integration
 """
 
+import asyncio
 import logging
 from typing import Dict, Optional, Any
 from datetime import datetime
 
-from app.services.supabase_service import supabase_service
+from app.services.supabase_service import get_supabase_service
+from app.services.pg_pool import get_pg_pool
 
 logger = logging.getLogger(__name__)
 
@@ -26,39 +28,26 @@ class UserService:
             Dict containing user profile data or None if not found
         """
         try:
-            # Get user from auth.users table
-            auth_user_result = await supabase_service.client.table('auth.users').select(
-                'id, email, raw_user_meta_data, raw_app_meta_data, created_at, updated_at, last_sign_in_at'
-            ).eq('id', user_id).single().execute()
-            
-            if not auth_user_result.data:
+            # user_profile_v joins the auth user, credits and identities
+            # (most recently used first) server-side
+            result = await asyncio.to_thread(
+                get_supabase_service().client.table('user_profile_v').select(
+                    'id, email, raw_user_meta_data, raw_app_meta_data, created_at, '
+                    'updated_at, last_sign_in_at, credits, identities'
+                ).eq('id', user_id).limit(1).execute
+            )
+            if not result.data:
                 return None
             
-            auth_user = auth_user_result.data
-            
-            # Get user credits
-            credits_result = await supabase_service.client.table('user_credits').select(
-                'credits, updated_at'
-            ).eq('user_id', user_id).single().execute()
-            
-            credits_data = credits_result.data if credits_result.data else {'credits': 0}
-            
-            # Get OAuth provider information
-            identity_result = await supabase_service.client.table('auth.identities').select(
-                'provider, identity_data, last_sign_in_at, created_at'
-            ).eq('user_id', user_id).execute()
-            
-            identities = identity_result.data if identity_result.data else []
+            auth_user = result.data[0]
+            identities = auth_user.get('identities') or []
             
             # Extract user metadata
-            user_meta = auth_user.get('raw_user_meta_data', {})
-            app_meta = auth_user.get('raw_app_meta_data', {})
+            user_meta = auth_user.get('raw_user_meta_data') or {}
+            app_meta = auth_user.get('raw_app_meta_data') or {}
             
-            # Determine primary provider
-            primary_provider = 'email'  # default
-            if identities:
-                # Use the most recent provider
-                primary_provider = max(identities, key=lambda x: x.get('last_sign_in_at', ''))['provider']
+            # Identities arrive most recently used first; that is the primary provider
+            primary_provider = identities[0]['provider'] if identities else 'email'
             
             # Build comprehensive user profile
             user_profile = {
@@ -67,7 +56,7 @@ class UserService:
                 'full_name': user_meta.get('full_name') or user_meta.get('name'),
                 'avatar_url': user_meta.get('avatar_url') or user_meta.get('picture'),
                 'provider': primary_provider,
-                'credits': credits_data['credits'],
+                'credits': auth_user['credits'],
                 'created_at': auth_user['created_at'],
                 'updated_at': auth_user['updated_at'],
                 'last_sign_in_at': auth_user['last_sign_in_at'],
@@ -119,7 +108,7 @@ class UserService:
             # Update user metadata if we have changes
             if user_meta_updates:
                 # Get current metadata
-                current_user = await supabase_service.client.table('auth.users').select(
+                current_user = await get_supabase_service().client.table('auth.users').select(
                     'raw_user_meta_data'
                 ).eq('id', user_id).single().execute()
                 
@@ -128,7 +117,7 @@ class UserService:
                     current_meta.update(user_meta_updates)
                     
                     # Update the user record
-                    await supabase_service.client.table('auth.users').update({
+                    await get_supabase_service().client.table('auth.users').update({
                         'raw_user_meta_data': current_meta,
                         'updated_at': datetime.utcnow().isoformat()
                     }).eq('id', user_id).execute()
@@ -151,71 +140,15 @@ class UserService:
             Dict containing user statistics
         """
         try:
-            # Get project count
-            projects_result = await supabase_service.client.table('brand_projects').select(
-                'id'
-            ).eq('user_id', user_id).execute()
-            
-            project_count = len(projects_result.data) if projects_result.data else 0
-            
-            # Get asset count
-            assets_result = await supabase_service.client.table('generated_assets').select(
-                'id, asset_type, status, credits_used'
-            ).in_('project_id', [p['id'] for p in projects_result.data] if projects_result.data else []).execute()
-            
-            assets = assets_result.data if assets_result.data else []
-            
-            # Calculate statistics
-            total_assets = len(assets)
-            completed_assets = len([a for a in assets if a['status'] == 'completed'])
-            total_credits_used = sum(a.get('credits_used', 0) for a in assets)
-            
-            # Get brand kit orders
-            brand_kits_result = await supabase_service.client.table('brand_kit_orders').select(
-                'id, order_status, payment_amount'
-            ).eq('user_id', user_id).execute()
-            
-            brand_kits = brand_kits_result.data if brand_kits_result.data else []
-            completed_brand_kits = len([bk for bk in brand_kits if bk['order_status'] == 'completed'])
-            total_spent = sum(float(bk.get('payment_amount', 0)) for bk in brand_kits if bk['order_status'] == 'completed')
-            
-            # Get current credits
-            credits_result = await supabase_service.client.table('user_credits').select(
-                'credits'
-            ).eq('user_id', user_id).single().execute()
-            
-            current_credits = credits_result.data['credits'] if credits_result.data else 0
-            
-            stats = {
-                'projects': {
-                    'total': project_count,
-                    'with_completed_assets': len(set(a['project_id'] for a in assets if a['status'] == 'completed'))
-                },
-                'assets': {
-                    'total': total_assets,
-                    'completed': completed_assets,
-                    'by_type': {}
-                },
-                'credits': {
-                    'current': current_credits,
-                    'total_used': total_credits_used
-                },
-                'brand_kits': {
-                    'total_ordered': len(brand_kits),
-                    'completed': completed_brand_kits,
-                    'total_spent': total_spent
-                }
-            }
-            
-            # Group assets by type
-            for asset in assets:
-                asset_type = asset['asset_type']
-                if asset_type not in stats['assets']['by_type']:
-                    stats['assets']['by_type'][asset_type] = {'total': 0, 'completed': 0}
-                
-                stats['assets']['by_type'][asset_type]['total'] += 1
-                if asset['status'] == 'completed':
-                    stats['assets']['by_type'][asset_type]['completed'] += 1
+            # All aggregates are computed by the get_user_stats SQL function
+            pool = await get_pg_pool()
+            if pool is not None:
+                stats = await pool.fetchval('SELECT get_user_stats($1)', user_id)
+            else:
+                result = await asyncio.to_thread(
+                    get_supabase_service().client.rpc('get_user_stats', {'uid': user_id}).execute
+                )
+                stats = result.data
             
             logger.info(f"Retrieved user stats for {user_id}")
             return stats
@@ -278,20 +211,22 @@ class UserService:
             True if successful, False otherwise
         """
         try:
-            # Check if user has multiple providers
-            identities_result = await supabase_service.client.table('auth.identities').select(
-                'provider'
-            ).eq('user_id', user_id).execute()
-            
-            identities = identities_result.data if identities_result.data else []
-            
-            if len(identities) <= 1:
+            # Check if user has multiple providers; a HEAD count returns no rows
+            count_result = await asyncio.to_thread(
+                get_supabase_service().client.table('auth.identities').select(
+                    'provider', count='exact', head=True
+                ).eq('user_id', user_id).execute
+            )
+            
+            if (count_result.count or 0) <= 1:
                 raise ValueError("Cannot unlink the only authentication method")
             
             # Remove the identity (this should be done through Supabase Admin API)
-            await supabase_service.client.table('auth.identities').delete().eq(
-                'user_id', user_id
-            ).eq('provider', provider).execute()
+            await asyncio.to_thread(
+                get_supabase_service().client.table('auth.identities').delete().eq(
+                    'user_id', user_id
+                ).eq('provider', provider).execute
+            )
             
             logger.info(f"OAuth provider {provider} unlinked from user {user_id}")
             return True
@@ -5,16 +5,16 @@ Uses fallback prompts to avoid API calls
 """
 
 import sys
-import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.models.schemas import BrandInfo
-from app.services.prompt_engineering_service import PromptEngineeringService
+# Studio label per prompt position: 5 Helios, 5 '78, 5 Apex
+STUDIOS = ("Helios",) * 5 + ("'78",) * 5 + ("Apex",) * 5
 
 def demo_prompts():
     """Generate prompts for 3 sample companies"""
     
-    prompt_service = PromptEngineeringService()
+    # Only the template module is needed; importing the full prompt service
+    # would configure Gemini and load settings for nothing
+    from app.services.fallback_prompts import render_fallback_prompts
     
     # 3 Sample Companies
     companies = [
@@ -35,48 +35,36 @@ def demo_prompts():
         }
     ]
     
-    print("🎨 LogoKraft APEX-7 Prompt Generation Demo")
-    print("=" * 60)
+    # Buffer the whole report and write it once instead of printing line by line
+    out = ["🎨 LogoKraft APEX-7 Prompt Generation Demo", "=" * 60]
     
     for i, company_data in enumerate(companies, 1):
-        print(f"\n{i}. COMPANY: {company_data['name']}")
-        print(f"   INDUSTRY: {company_data['industry']}")
-        print(f"   DESCRIPTION: {company_data['description']}")
-        print("-" * 60)
-        
-        # Create BrandInfo object
-        brand_info = BrandInfo(
-            company_name=company_data["name"],
-            industry=company_data["industry"],
-            description=company_data["description"],
-            inspirations=[]
-        )
+        out.append(f"\n{i}. COMPANY: {company_data['name']}")
+        out.append(f"   INDUSTRY: {company_data['industry']}")
+        out.append(f"   DESCRIPTION: {company_data['description']}")
+        out.append("-" * 60)
         
         # Use fallback prompts (no API call)
-        print("   GENERATING FALLBACK PROMPTS (15 total):")
-        fallback_prompts = prompt_service._get_fallback_prompts(brand_info)
+        out.append("   GENERATING FALLBACK PROMPTS (15 total):")
+        fallback_prompts = render_fallback_prompts(company_data["name"], company_data["industry"])
         
         # Show ALL 15 prompts
-        print("\n   ALL 15 PROMPTS:")
+        out.append("\n   ALL 15 PROMPTS:")
         
-        for j, prompt in enumerate(fallback_prompts, 1):
-            if j <= 5:
-                studio = "Helios"
-            elif j <= 10:
-                studio = "'78"
-            else:
-                studio = "Apex"
-            print(f"      {j:2d}. [{studio:>6}] {prompt}")
+        for j, (studio, prompt) in enumerate(zip(STUDIOS, fallback_prompts), 1):
+            out.append(f"      {j:2d}. [{studio:>6}] {prompt}")
         
-        print(f"\n   ✅ Total: 15 unique prompts generated")
+        out.append(f"\n   ✅ Total: 15 unique prompts generated")
         if i < len(companies):
-            print("\n" + "="*60)
+            out.append("\n" + "="*60)
+    
+    out.append(f"\n🎯 SUMMARY:")
+    out.append(f"   • 3 Companies across different industries")
+    out.append(f"   • 15 prompts each = 45 total unique prompts")
+    out.append(f"   • Mix of Helios (cinematic), '78 (typography), Apex (minimal)")
+    out.append(f"   • Each prompt 40-60 words of specific creative direction")
     
-    print(f"\n🎯 SUMMARY:")
-    print(f"   • 3 Companies across different industries")
-    print(f"   • 15 prompts each = 45 total unique prompts")
-    print(f"   • Mix of Helios (cinematic), '78 (typography), Apex (minimal)")
-    print(f"   • Each prompt 40-60 words of specific creative direction")
+    sys.stdout.write("\n".join(out) + "\n")
 
 if __name__ == "__main__":
     demo_prompts()
\ No newline at end of file
@@ -0,0 +1,6 @@
+-- Let Postgres stamp generated_assets rows so inserts don't have to send
+-- created_at / updated_at from the application.
+
+ALTER TABLE generated_assets
+    ALTER COLUMN created_at SET DEFAULT now(),
+    ALTER COLUMN updated_at SET DEFAULT now();
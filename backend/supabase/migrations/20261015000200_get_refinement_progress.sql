@@ -0,0 +1,37 @@
+-- Refinement progress computed in the database: per-status counts plus the
+-- completed variations, so the API doesn't download every variation row.
+
+CREATE OR REPLACE FUNCTION get_refinement_progress(p_asset_id UUID)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'counts', COALESCE(
+            (
+                SELECT jsonb_object_agg(status, n)
+                FROM (
+                    SELECT status, count(*) AS n
+                    FROM generated_assets
+                    WHERE parent_asset_id = p_asset_id
+                      AND asset_type = 'simple_refinement'
+                    GROUP BY status
+                ) AS status_counts
+            ),
+            '{}'::jsonb
+        ),
+        'completed', COALESCE(
+            (
+                SELECT jsonb_agg(
+                    jsonb_build_object('id', id, 'asset_url', asset_url, 'created_at', created_at)
+                    ORDER BY created_at
+                )
+                FROM generated_assets
+                WHERE parent_asset_id = p_asset_id
+                  AND asset_type = 'simple_refinement'
+                  AND status = 'completed'
+            ),
+            '[]'::jsonb
+        )
+    );
+$$;
@@ -0,0 +1,14 @@
+-- Mark several assets failed in one round trip, each with its own error.
+-- p_items: [{"id": "<uuid>", "error": "<message>"}, ...]
+
+CREATE OR REPLACE FUNCTION mark_assets_failed_batch(p_items JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    UPDATE generated_assets AS ga
+    SET status = 'failed',
+        error_message = items.error,
+        updated_at = now()
+    FROM jsonb_to_recordset(p_items) AS items(id UUID, error TEXT)
+    WHERE ga.id = items.id;
+$$;
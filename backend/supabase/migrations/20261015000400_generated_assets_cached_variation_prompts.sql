@@ -0,0 +1,5 @@
+-- Variation prompts precomputed when a logo finishes generating, so a plain
+-- "give me variations" refinement doesn't wait on Gemini analysis.
+
+ALTER TABLE generated_assets
+    ADD COLUMN IF NOT EXISTS cached_variation_prompts JSONB;
@@ -0,0 +1,57 @@
+-- Start a simple refinement atomically: lock the user's credit row, check
+-- and deduct the cost, then create the variation assets. Any failure rolls
+-- back the whole transaction, so the API never has to refund.
+-- The cost is fixed here rather than passed in, and only the backend's
+-- service role may call it.
+
+-- Earlier revision took the cost as a parameter
+DROP FUNCTION IF EXISTS start_simple_refinement(UUID, UUID, JSONB, INTEGER);
+
+CREATE OR REPLACE FUNCTION start_simple_refinement(
+    p_user_id UUID,
+    p_asset_id UUID,
+    p_variations JSONB
+)
+RETURNS TABLE (asset_id UUID)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    -- 5 credits for 5 variations
+    v_cost CONSTANT INTEGER := 5;
+    v_balance INTEGER;
+BEGIN
+    SELECT uc.credits INTO v_balance
+    FROM user_credits AS uc
+    WHERE uc.user_id = p_user_id
+    FOR UPDATE;
+
+    IF v_balance IS NULL OR v_balance < v_cost THEN
+        RAISE EXCEPTION 'insufficient_credits';
+    END IF;
+
+    -- Reuse the existing functions so the audit trail and ownership checks
+    -- stay in one place. Named arguments, so a reordered signature can't
+    -- silently bind the wrong values inside this privileged function
+    IF NOT deduct_user_credits(
+        p_user_id => p_user_id,
+        p_credits => v_cost,
+        p_reason => 'Simple refinement of asset ' || p_asset_id,
+        p_asset_id => p_asset_id
+    ) THEN
+        RAISE EXCEPTION 'credit_deduction_failed';
+    END IF;
+
+    RETURN QUERY
+    SELECT created.asset_id
+    FROM create_refinement_assets_batch(
+        p_user_id => p_user_id,
+        p_original_asset_id => p_asset_id,
+        p_variations => p_variations
+    ) AS created;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION start_simple_refinement(UUID, UUID, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION start_simple_refinement(UUID, UUID, JSONB) TO service_role;
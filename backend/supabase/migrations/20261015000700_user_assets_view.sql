@@ -0,0 +1,63 @@
+-- Generated assets with their owning user, so per-user asset queries filter
+-- on user_id server-side instead of sending project ID lists back and forth.
+
+CREATE OR REPLACE VIEW user_assets_v
+WITH (security_invoker = true)
+AS
+SELECT ga.id, ga.project_id, bp.user_id, ga.asset_type, ga.status, ga.credits_used, ga.created_at
+FROM generated_assets AS ga
+JOIN brand_projects AS bp ON bp.id = ga.project_id;
+
+-- get_user_stats reads assets through the view
+CREATE OR REPLACE FUNCTION get_user_stats(uid UUID)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH user_assets AS (
+        SELECT project_id, asset_type, status, COALESCE(credits_used, 0) AS credits_used
+        FROM user_assets_v
+        WHERE user_id = uid
+    ),
+    asset_types AS (
+        SELECT asset_type,
+               count(*) AS total,
+               count(*) FILTER (WHERE status = 'completed') AS completed
+        FROM user_assets
+        GROUP BY asset_type
+    ),
+    kits AS (
+        SELECT count(*) AS total_ordered,
+               count(*) FILTER (WHERE order_status = 'completed') AS completed,
+               COALESCE(sum(payment_amount) FILTER (WHERE order_status = 'completed'), 0) AS total_spent
+        FROM brand_kit_orders
+        WHERE user_id = uid
+    )
+    SELECT jsonb_build_object(
+        'projects', jsonb_build_object(
+            'total', (SELECT count(*) FROM brand_projects WHERE user_id = uid),
+            'with_completed_assets', (SELECT count(DISTINCT project_id) FROM user_assets WHERE status = 'completed')
+        ),
+        'assets', jsonb_build_object(
+            'total', (SELECT count(*) FROM user_assets),
+            'completed', (SELECT count(*) FROM user_assets WHERE status = 'completed'),
+            'by_type', COALESCE(
+                (SELECT jsonb_object_agg(asset_type, jsonb_build_object('total', total, 'completed', completed))
+                 FROM asset_types),
+                '{}'::jsonb
+            )
+        ),
+        'credits', jsonb_build_object(
+            'current', COALESCE((SELECT credits FROM user_credits WHERE user_id = uid), 0),
+            'total_used', (SELECT COALESCE(sum(credits_used), 0) FROM user_assets)
+        ),
+        'brand_kits', (
+            SELECT jsonb_build_object(
+                'total_ordered', total_ordered,
+                'completed', completed,
+                'total_spent', total_spent
+            )
+            FROM kits
+        )
+    );
+$$;
@@ -0,0 +1,10 @@
+-- Trivial liveness probe for the API health check; touches no tables so
+-- its cost does not grow with brand_projects.
+
+CREATE OR REPLACE FUNCTION ping()
+RETURNS INT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT 1;
+$$;
@@ -0,0 +1,32 @@
+-- One row per user with credits and linked identities (most recently used
+-- first), so a profile is a single lookup instead of three queries.
+-- The view reads auth.users as its owner, so it is only exposed to the
+-- service role.
+
+CREATE OR REPLACE VIEW user_profile_v AS
+SELECT u.id,
+       u.email,
+       u.raw_user_meta_data,
+       u.raw_app_meta_data,
+       u.created_at,
+       u.updated_at,
+       u.last_sign_in_at,
+       COALESCE(uc.credits, 0) AS credits,
+       COALESCE(
+           (SELECT jsonb_agg(
+                       jsonb_build_object(
+                           'provider', i.provider,
+                           'created_at', i.created_at,
+                           'last_sign_in_at', i.last_sign_in_at
+                       )
+                       ORDER BY i.last_sign_in_at DESC NULLS LAST
+                   )
+            FROM auth.identities AS i
+            WHERE i.user_id = u.id),
+           '[]'::jsonb
+       ) AS identities
+FROM auth.users AS u
+LEFT JOIN user_credits AS uc ON uc.user_id = u.id;
+
+REVOKE ALL ON user_profile_v FROM anon, authenticated;
+GRANT SELECT ON user_profile_v TO service_role;
@@ -0,0 +1,82 @@
+"""
+Batch generation crash handling: a batch that dies before its assets are
+settled must leave none of them pending/generating.
+
+Run from backend/: python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+# Settings are read at import time; these only need to be well-formed
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon-key")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "service-key")
+os.environ.setdefault("GOOGLE_API_KEY", "google-key")
+os.environ.setdefault("FAL_KEY", "fal-key")
+
+from app.services import batch_image_generation_service, orchestrator_service
+from app.services.orchestrator_service import OrchestratorService
+
+
+class _FakeQuery:
+    """Just enough of a postgrest update builder to filter and apply updates."""
+
+    def __init__(self, rows, update_data):
+        self._rows = rows
+        self._update_data = update_data
+        self._filters = []
+
+    def eq(self, column, value):
+        self._filters.append(lambda row: row[column] == value)
+        return self
+
+    def in_(self, column, values):
+        self._filters.append(lambda row: row[column] in values)
+        return self
+
+    def execute(self):
+        for row in self._rows.values():
+            if all(match(row) for match in self._filters):
+                row.update(self._update_data)
+        return mock.Mock(error=None)
+
+
+class _FakeSupabaseService:
+    """In-memory generated_assets table behind client.table(...).update(...)."""
+
+    def __init__(self, asset_ids):
+        self.assets = {asset_id: {"id": asset_id, "status": "pending"} for asset_id in asset_ids}
+        self.client = mock.Mock()
+        self.client.table.return_value.update.side_effect = lambda data: _FakeQuery(self.assets, data)
+
+
+class BatchCrashTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_submit_failure_marks_assets_failed(self):
+        asset_ids = [f"a{i}" for i in range(15)]
+        prompts = [f"prompt {i}" for i in range(15)]
+        supabase = _FakeSupabaseService(asset_ids)
+
+        with mock.patch.object(orchestrator_service, "get_supabase_service", return_value=supabase), \
+                mock.patch.object(batch_image_generation_service, "get_supabase_service", return_value=supabase), \
+                mock.patch.object(batch_image_generation_service.fal_client, "submit",
+                                  side_effect=RuntimeError("fal.ai unavailable")):
+            orchestrator = OrchestratorService()
+            orchestrator._get_project_data = mock.AsyncMock(return_value={"project_name": "Acme", "brief_data": {}})
+            orchestrator.prompt_service = mock.Mock(generate_prompts=mock.AsyncMock(return_value=prompts))
+            orchestrator._create_asset_entries = mock.AsyncMock(return_value=asset_ids)
+
+            await orchestrator.start_logo_generation("project-1")
+            # Let the batch task, its done-callback and the cleanup task run
+            while orchestrator_service._background_tasks:
+                await asyncio.gather(*orchestrator_service._background_tasks, return_exceptions=True)
+
+        self.assertEqual({row["status"] for row in supabase.assets.values()}, {"failed"})
+        self.assertIn("fal.ai unavailable", supabase.assets["a0"]["error_message"])
+
+
+if __name__ == "__main__":
+    unittest.main()
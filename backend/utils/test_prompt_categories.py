@@ -198,7 +198,7 @@ async def main():
             print(f"\n🔄 Generating prompts for {brand_info.company_name} ({brand_info.industry})...")
             
             # Generate prompts using APEX-7
-            prompts = analyzer.prompt_service.generate_prompts(brand_info)
+            prompts = await analyzer.prompt_service.generate_prompts(brand_info)
             
             # Analyze the generated prompts
             analysis = analyzer.analyze_prompt_variety(brand_info.company_name, prompts)
@@ -3,15 +3,23 @@
 Verify LogoKraft database and storage setup
 """
 
+import functools
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Optional
 import sys
 
-load_dotenv()
+if TYPE_CHECKING:
+    from supabase import Client
 
-def get_supabase_client():
-    """Create Supabase client"""
+@functools.lru_cache(maxsize=1)
+def get_supabase_client() -> Optional["Client"]:
+    """Create Supabase client (once; later calls reuse it and its connection pool)"""
+    # Imported here so importing this module stays cheap (e.g. test collection)
+    from dotenv import load_dotenv
+    from supabase import create_client
+    
+    load_dotenv()
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
     
@@ -21,42 +29,42 @@ def get_supabase_client():
     
     return create_client(url, key)
 
-def verify_tables(supabase: Client):
+# Tables and buckets the backend expects; probed concurrently, reported in this order
+REQUIRED_TABLES = ('brand_projects', 'generated_assets')
+REQUIRED_BUCKETS = ('inspiration-images', 'generated-assets')
+
+def probe_table(supabase: "Client", table: str):
+    """HEAD count request that proves a table exists without fetching rows"""
+    return supabase.table(table).select("id", count="exact", head=True).execute()
+
+def verify_tables(table_futures: Dict[str, Future]):
     """Verify tables exist"""
     print("\n🔍 Verifying Tables...")
     
     try:
-        # Test brand_projects table
-        result = supabase.table('brand_projects').select("*").limit(1).execute()
-        print("✅ brand_projects table exists")
-        
-        # Test generated_assets table
-        result = supabase.table('generated_assets').select("*").limit(1).execute()
-        print("✅ generated_assets table exists")
+        for table in REQUIRED_TABLES:
+            table_futures[table].result()
+            print(f"✅ {table} table exists")
         
         return True
     except Exception as e:
         print(f"❌ Error accessing tables: {str(e)}")
         return False
 
-def verify_storage(supabase: Client):
+def verify_storage(buckets_future: Future):
     """Verify storage buckets"""
     print("\n🔍 Verifying Storage Buckets...")
     
     try:
         # List buckets
-        buckets = supabase.storage.list_buckets()
-        bucket_names = [b.name for b in buckets]
+        buckets = buckets_future.result()
+        bucket_names = {b.name for b in buckets}
         
-        if 'inspiration-images' in bucket_names:
-            print("✅ inspiration-images bucket exists")
-        else:
-            print("❌ inspiration-images bucket not found")
-            
-        if 'generated-assets' in bucket_names:
-            print("✅ generated-assets bucket exists")
-        else:
-            print("❌ generated-assets bucket not found")
+        for bucket in REQUIRED_BUCKETS:
+            if bucket in bucket_names:
+                print(f"✅ {bucket} bucket exists")
+            else:
+                print(f"❌ {bucket} bucket not found")
             
         return True
     except Exception as e:
@@ -76,9 +84,16 @@ def main():
     print("✅ Connected to Supabase")
     print(f"   URL: {os.getenv('SUPABASE_URL')}")
     
-    # Verify components
-    tables_ok = verify_tables(supabase)
-    storage_ok = verify_storage(supabase)
+    # Verify components; the round trips overlap, results print in a fixed order
+    with ThreadPoolExecutor(max_workers=len(REQUIRED_TABLES) + 1) as executor:
+        table_futures = {
+            table: executor.submit(probe_table, supabase, table)
+            for table in REQUIRED_TABLES
+        }
+        buckets_future = executor.submit(supabase.storage.list_buckets)
+        
+        tables_ok = verify_tables(table_futures)
+        storage_ok = verify_storage(buckets_future)
     
     print("\n" + "=" * 50)
     